@@ -1,4 +1,4 @@
 import os
 
-GENERATED_DIR = 'generated'
+GENERATED_DIR = os.getenv("SDG_GENERATED_DIR", "generated")
 os.makedirs(GENERATED_DIR, exist_ok=True)
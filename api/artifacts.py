@@ -0,0 +1,290 @@
+import os
+import gzip
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from api import GENERATED_DIR
+from api.loger import get_logger
+
+
+logger = get_logger(__name__)
+
+# Индекс артефактов лежит рядом с ними; скрытое имя не отдаётся через /api/download
+ARTIFACTS_DB = os.getenv("SDG_ARTIFACTS_DB", os.path.join(GENERATED_DIR, ".index.sqlite3"))
+# Артефакт, который не скачивали дольше TTL (секунды), удаляется; 0 — без TTL
+ARTIFACT_TTL = float(os.getenv("SDG_ARTIFACT_TTL", str(24 * 3600)))
+# Квота на суммарный размер артефактов (вместе с gzip-вариантами)
+ARTIFACT_MAX_BYTES = int(os.getenv("SDG_ARTIFACT_MAX_BYTES", str(10 * 1024 ** 3)))
+ARTIFACT_SWEEP_INTERVAL = float(os.getenv("SDG_ARTIFACT_SWEEP_INTERVAL", "300"))
+
+# Степень сжатия gzip-варианта артефакта
+GZIP_LEVEL = int(os.getenv("SDG_GZIP_LEVEL", "6"))
+GZIP_SUFFIX = ".gz"
+
+_READ_CHUNK = 1024 * 1024
+
+# path -> (st_mtime_ns, st_size, etag): хэш содержимого считается один раз на версию файла
+_etags: Dict[str, Tuple[int, int, str]] = {}
+_etags_lock = threading.Lock()
+
+
+def gzip_path(path: str) -> str:
+    return path + GZIP_SUFFIX
+
+
+def gzip_etag(etag: str) -> str:
+    """ETag gzip-варианта: у разных представлений ресурса ETag должны различаться."""
+    return etag[:-1] + '-gzip"'
+
+
+def _remember(path: str, digest: str) -> str:
+    stat = os.stat(path)
+    etag = f'"{digest}"'
+    with _etags_lock:
+        _etags[path] = (stat.st_mtime_ns, stat.st_size, etag)
+    return etag
+
+
+def _write_gzip(path: str, payload: bytes):
+    # Пишем во временный файл: скачивание не должно увидеть недописанный вариант
+    tmp_path = gzip_path(path) + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(gzip.compress(payload, compresslevel=GZIP_LEVEL, mtime=0))
+    os.replace(tmp_path, gzip_path(path))
+
+
+def _disk_size(path: str) -> int:
+    """Размер артефакта на диске вместе с gzip-вариантом."""
+    size = os.path.getsize(path)
+    if os.path.exists(gzip_path(path)):
+        size += os.path.getsize(gzip_path(path))
+    return size
+
+
+def write_artifact(path: str, payload: bytes) -> Tuple[str, int]:
+    """
+    Пишет артефакт и его gzip-вариант рядом.
+    Возвращает ETag по хэшу содержимого и размер на диске.
+    """
+    # Как и gzip-вариант — через временный файл: скачивание не увидит недописанный JSON
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+    _write_gzip(path, payload)
+    return _remember(path, hashlib.sha256(payload).hexdigest()), _disk_size(path)
+
+
+def finalize_artifact(path: str, written_path: Optional[str] = None) -> Tuple[str, int]:
+    """
+    Для артефакта, записанного потоком (задачи): gzip-вариант и хэш
+    содержимого за один проход чтения, без загрузки файла в память.
+    written_path — временный файл, в который писался артефакт: он
+    переименовывается в path после записи gzip-варианта.
+    """
+    source = written_path or path
+    digest = hashlib.sha256()
+    tmp_path = gzip_path(path) + ".tmp"
+    with open(source, "rb") as src, open(tmp_path, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=GZIP_LEVEL, mtime=0) as dst:
+            for chunk in iter(lambda: src.read(_READ_CHUNK), b""):
+                digest.update(chunk)
+                dst.write(chunk)
+    os.replace(tmp_path, gzip_path(path))
+    if written_path is not None:
+        os.replace(written_path, path)
+    return _remember(path, digest.hexdigest()), _disk_size(path)
+
+
+def artifact_etag(path: str) -> str:
+    """ETag артефакта; для файлов, записанных не через write_artifact, хэш считается при первом запросе."""
+    stat = os.stat(path)
+    with _etags_lock:
+        cached = _etags.get(path)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_READ_CHUNK), b""):
+            digest.update(chunk)
+    return _remember(path, digest.hexdigest())
+
+
+class ArtifactStore:
+    """
+    Жизненный цикл артефактов в generated/: индекс метаданных в SQLite
+    (размер, время создания и последнего скачивания, хэш blueprint, ETag),
+    удаление по TTL и вытеснение давно не скачанных (LRU) сверх квоты.
+    Индекс избавляет от stat по каждому файлу; соединение открывается
+    на каждую операцию — артефакты регистрируют и процессы-воркеры задач.
+    """
+
+    def __init__(
+            self,
+            directory: str = GENERATED_DIR,
+            path: str = ARTIFACTS_DB,
+            ttl: float = ARTIFACT_TTL,
+            max_bytes: int = ARTIFACT_MAX_BYTES
+            ):
+        self.directory = directory
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        index_dir = os.path.dirname(path)
+        if index_dir:
+            os.makedirs(index_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS artifacts (
+                    filename TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    etag TEXT NOT NULL,
+                    blueprint_hash TEXT,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def register(self, filename: str, etag: str, size: int, blueprint_hash: Optional[str] = None):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO artifacts (filename, size, etag, blueprint_hash, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (filename, size, etag, blueprint_hash, now, now),
+            )
+
+    def get(self, filename: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM artifacts WHERE filename = ?", (filename,)).fetchone()
+        return dict(row) if row else None
+
+    def touch(self, filename: str) -> Optional[Dict[str, Any]]:
+        """
+        Отметить обращение к артефакту (скачивание или попадание в кэш результатов)
+        и вернуть его метаданные. Файл, которого нет в индексе (записан до его
+        появления), добавляется в индекс при первом обращении.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            updated = conn.execute(
+                "UPDATE artifacts SET last_access = ? WHERE filename = ?", (now, filename)
+            ).rowcount
+        if updated:
+            return self.get(filename)
+        return self._adopt(filename)
+
+    def _adopt(self, filename: str) -> Optional[Dict[str, Any]]:
+        path = os.path.join(self.directory, filename)
+        if not filename.endswith(".json") or filename.startswith(".") or not os.path.isfile(path):
+            return None
+        self.register(filename, artifact_etag(path), _disk_size(path))
+        return self.get(filename)
+
+    def total_bytes(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0]
+
+    def reconcile(self) -> int:
+        """
+        Сверка индекса с каталогом (при старте): удаляет записи об исчезнувших
+        файлах и добавляет файлы, которых нет в индексе. Возвращает число изменений.
+        """
+        with self._connect() as conn:
+            indexed = {row["filename"] for row in conn.execute("SELECT filename FROM artifacts")}
+        on_disk = {
+            name for name in os.listdir(self.directory)
+            if name.endswith(".json") and not name.startswith(".")
+        }
+        missing = indexed - on_disk
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM artifacts WHERE filename = ?", [(name,) for name in missing])
+        for name in on_disk - indexed:
+            self._adopt(name)
+        return len(missing) + len(on_disk - indexed)
+
+    def sweep(self, now: Optional[float] = None) -> List[str]:
+        """
+        Удаляет артефакты, не скачанные дольше TTL, затем — давно не скачанные,
+        пока суммарный размер превышает квоту (самый свежий остаётся всегда).
+        """
+        now = time.time() if now is None else now
+        with self._connect() as conn:
+            rows = conn.execute("SELECT filename, size, last_access FROM artifacts ORDER BY last_access").fetchall()
+            evicted = []
+            total = sum(row["size"] for row in rows)
+            for idx, row in enumerate(rows):
+                expired = self.ttl > 0 and row["last_access"] < now - self.ttl
+                over_quota = total > self.max_bytes and idx < len(rows) - 1
+                if not (expired or over_quota):
+                    continue
+                evicted.append(row["filename"])
+                total -= row["size"]
+            conn.executemany("DELETE FROM artifacts WHERE filename = ?", [(name,) for name in evicted])
+
+        for filename in evicted:
+            path = os.path.join(self.directory, filename)
+            for victim in (path, gzip_path(path)):
+                try:
+                    os.remove(victim)
+                except FileNotFoundError:
+                    pass
+            with _etags_lock:
+                _etags.pop(path, None)
+        if evicted:
+            logger.info(f"Удалено артефактов: {len(evicted)}, осталось {total} байт")
+        return evicted
+
+
+class ArtifactSweeper:
+    """Фоновый поток, периодически вызывающий ArtifactStore.sweep()."""
+
+    def __init__(self, store: ArtifactStore, interval: float = ARTIFACT_SWEEP_INTERVAL):
+        self.store = store
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="artifact-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.store.sweep()
+            except Exception as e:
+                logger.exception(f"❌ Ошибка очистки артефактов: {e}")
+
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Общий для процесса ArtifactStore (создаётся при первом обращении)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore()
+        return _store
@@ -0,0 +1,85 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from api import GENERATED_DIR
+from core import __version__ as GENERATOR_VERSION
+from core.models import GenerationRequest
+from core.utils import blueprint_hash
+
+
+RESULT_CACHE_ENTRIES = int(os.getenv("SDG_RESULT_CACHE_ENTRIES", "256"))
+RESULT_CACHE_BYTES = int(os.getenv("SDG_RESULT_CACHE_BYTES", str(1024 ** 3)))
+
+
+class CachedResult(NamedTuple):
+    filename: str
+    # Размер сериализованного результата в байтах
+    size: int
+    # Первые MAX_PREVIEW_ROWS записей каждой сущности (JSON) — для response_mode=summary без чтения файла
+    preview: bytes
+
+
+class ResultCache:
+    """
+    Кэш результатов детерминированной генерации: ключ — хэш blueprint, seed
+    и версия генератора, значение — уже записанный файл в generated/.
+    Вытеснение LRU по числу записей и суммарному размеру файлов.
+    """
+
+    def __init__(self, max_entries: int = RESULT_CACHE_ENTRIES, max_bytes: int = RESULT_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CachedResult]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(request: GenerationRequest) -> Optional[str]:
+        """Ключ кэша; без seed результат не детерминирован и не кэшируется."""
+        if request.seed is None:
+            return None
+        raw = f"{blueprint_hash(request.blueprint)}:{request.seed}:{GENERATOR_VERSION}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str) -> Optional[CachedResult]:
+        """Запись кэша или None, если её нет (или файл уже удалён)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not os.path.exists(os.path.join(GENERATED_DIR, entry.filename)):
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def get(self, key: str) -> Optional[str]:
+        """Имя файла результата или None."""
+        entry = self.lookup(key)
+        return entry.filename if entry is not None else None
+
+    def put(self, key: str, filename: str, size: int, preview: bytes = b"{}"):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = CachedResult(filename, size, preview)
+            self._size += size
+            while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str):
+        self._size -= self._entries.pop(key).size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Общий кэш результатов
+result_cache = ResultCache()
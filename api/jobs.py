@@ -0,0 +1,259 @@
+import os
+import json
+import time
+import sqlite3
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import uuid4
+
+from api import GENERATED_DIR
+from api.artifacts import finalize_artifact, get_artifact_store, gzip_path
+from api.loger import get_logger
+from api.serialization import dumps
+from core.engine import ENGINE_WORKERS, DataGenerationEngine
+from core.models import GenerationRequest
+from core.utils import blueprint_hash, iter_rows
+
+
+logger = get_logger(__name__)
+
+JOBS_DB = os.getenv("SDG_JOBS_DB", os.path.join("jobs", "jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("SDG_JOB_WORKERS", "2"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class JobStore:
+    """
+    Очередь задач на диске (SQLite): задачи переживают перезапуск сервера.
+    Соединение открывается на каждую операцию — хранилище используется
+    и из API-процесса, и из процессов-воркеров.
+    """
+
+    def __init__(self, path: str = JOBS_DB):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    request TEXT NOT NULL,
+                    progress REAL NOT NULL DEFAULT 0,
+                    filename TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def create(self, request: GenerationRequest) -> str:
+        job_id = uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, request, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(request.to_dict(), ensure_ascii=False), now, now),
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def update(self, job_id: str, **fields: Any):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def unfinished(self) -> List[Dict[str, Any]]:
+        """Задачи, не доведённые до конца (в т.ч. прерванные перезапуском), по порядку создания."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Число задач в каждом статусе."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+
+def write_dataset(
+        chunks: Iterator[Tuple[str, Dict[str, List[Any]]]],
+        path: str,
+        on_chunk=None
+        ):
+    """
+    Пишет результат execute_iter в JSON-файл {сущность: [записи...]} по мере генерации,
+    не собирая весь датасет в памяти. Куски одной сущности идут подряд.
+    """
+    current = None
+    with open(path, "wb") as f:
+        f.write(b"{")
+        for entity_name, columns in chunks:
+            if entity_name != current:
+                if current is not None:
+                    f.write(b"],")
+                f.write(dumps(entity_name) + b":[")
+                first = True
+                current = entity_name
+            for row in iter_rows(columns):
+                if not first:
+                    f.write(b",")
+                f.write(dumps(row))
+                first = False
+            if on_chunk is not None:
+                on_chunk(entity_name, len(next(iter(columns.values()))))
+        if current is not None:
+            f.write(b"]")
+        f.write(b"}")
+
+
+def run_job(job_id: str, db_path: str) -> str:
+    """Выполняется в процессе-воркере: генерирует датасет и пишет его в generated/."""
+    store = JobStore(db_path)
+    job = store.get(job_id)
+    request = GenerationRequest.from_dict(json.loads(job["request"]))
+    store.update(job_id, status=RUNNING, progress=0.0, error=None)
+
+    total = sum(entity.count for entity in request.blueprint.entities.values())
+    done = 0
+
+    def on_chunk(entity_name: str, rows: int):
+        nonlocal done
+        done += rows
+        store.update(job_id, progress=round(done / total, 4))
+
+    os.makedirs(GENERATED_DIR, exist_ok=True)
+    filename = f"blueprint_{job_id}.json"
+    # Шарды задачи генерируются в пуле процессов воркера задачи (SDG_ENGINE_WORKERS)
+    engine = DataGenerationEngine(request.seed, workers=ENGINE_WORKERS)
+    path = os.path.join(GENERATED_DIR, filename)
+    # Имя артефакта предсказуемо: пока задача пишет, файл под ним не виден скачиванию и reconcile()
+    tmp_path = path + ".tmp"
+    try:
+        write_dataset(engine.execute_iter(request.blueprint), tmp_path, on_chunk)
+        etag, size = finalize_artifact(path, tmp_path)
+    except BaseException:
+        for leftover in (tmp_path, gzip_path(path) + ".tmp"):
+            try:
+                os.remove(leftover)
+            except FileNotFoundError:
+                pass
+        raise
+    get_artifact_store().register(filename, etag, size, blueprint_hash=blueprint_hash(request.blueprint))
+
+    store.update(job_id, status=DONE, progress=1.0, filename=filename)
+    return filename
+
+
+class JobManager:
+    """
+    Пул процессов ограниченного размера, выполняющий задачи из JobStore.
+    Генерация идёт вне процесса API, поэтому тяжёлые blueprint'ы не занимают его threadpool.
+    """
+
+    def __init__(self, store: JobStore, workers: int = JOB_WORKERS):
+        self.store = store
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def submit(self, request: GenerationRequest) -> str:
+        job_id = self.store.create(request)
+        self._dispatch(job_id)
+        return job_id
+
+    def _reset_executor(self, executor: ProcessPoolExecutor):
+        """Убрать сломанный пул; следующий _get_executor создаст новый."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, job_id: str) -> Future:
+        executor = self._get_executor()
+        try:
+            return executor.submit(run_job, job_id, self.store.path)
+        except BrokenProcessPool:
+            self._reset_executor(executor)
+            raise
+
+    def _dispatch(self, job_id: str):
+        try:
+            try:
+                future = self._submit(job_id)
+            except BrokenProcessPool:
+                # Воркер пула погиб (например, OOM на большом blueprint) — такой пул
+                # больше не принимает задач: он пересоздан, пробуем ещё раз
+                logger.warning(f"Пул задач пересоздан после гибели воркера, задача {job_id}")
+                future = self._submit(job_id)
+        except Exception as e:
+            logger.error(f"❌ Не удалось запустить задачу {job_id}: {e}")
+            self.store.update(job_id, status=FAILED, error=str(e))
+            return
+        future.add_done_callback(lambda f: self._on_done(job_id, f))
+
+    def _on_done(self, job_id: str, future: Future):
+        error = future.exception()
+        if error is None:
+            logger.info(f"Задача {job_id} выполнена: {future.result()}")
+            return
+        logger.error(f"❌ Задача {job_id} завершилась с ошибкой: {error}")
+        self.store.update(job_id, status=FAILED, error=str(error))
+
+    def resume(self) -> int:
+        """Повторно ставит в очередь задачи, прерванные перезапуском сервера."""
+        jobs = self.store.unfinished()
+        for job in jobs:
+            self.store.update(job["id"], status=QUEUED, progress=0.0)
+            self._dispatch(job["id"])
+        if jobs:
+            logger.info(f"Возобновлено задач из очереди: {len(jobs)}")
+        return len(jobs)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Общий для приложения JobManager (создаётся при первом обращении)."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager(JobStore())
+        return _manager
@@ -1,12 +1,59 @@
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from api.routes import generate, download, health
+from api.artifacts import ArtifactSweeper, get_artifact_store
+from api.jobs import get_job_manager
+from api.loger import get_logger
+from api.routes import generate, download, health, jobs, metrics
+from core.faker_pool import SUPPORTED_LOCALES, faker_pool
+from core.engine import ENGINE_WORKERS, shard_executors
+from core.pools import WARM_VALUE_POOLS, value_pools
+
+
+logger = get_logger(__name__)
+
+
+def warm_up():
+    """Экземпляры Faker и пулы значений поддерживаемых локалей создаются до первого запроса."""
+    start_time = time.perf_counter()
+    faker_pool.warm(SUPPORTED_LOCALES)
+    if WARM_VALUE_POOLS:
+        value_pools.warm(SUPPORTED_LOCALES)
+    # Процессы пула шардов запускаются (и прогреваются) до первого запроса
+    if ENGINE_WORKERS > 1:
+        shard_executors.warm(ENGINE_WORKERS)
+    elapsed = round(time.perf_counter() - start_time, 2)
+    logger.info(f"Прогрев завершён ({elapsed}s): locales={list(SUPPORTED_LOCALES)}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_up()
+    # Индекс артефактов сверяется с каталогом, устаревшие удаляются сразу и далее периодически
+    store = get_artifact_store()
+    store.reconcile()
+    store.sweep()
+    sweeper = ArtifactSweeper(store)
+    sweeper.start()
+    # Задачи, прерванные прошлым перезапуском, возвращаются в очередь
+    manager = get_job_manager()
+    manager.resume()
+    yield
+    manager.shutdown()
+    shard_executors.shutdown()
+    sweeper.stop()
+
 
 app = FastAPI(
     title="Synthetic Data Generator API",
     version="1.0.0",
-    description="API для генерации синтетических данных по JSON-чертежу."
+    description="API для генерации синтетических данных по JSON-чертежу.",
+    lifespan=lifespan
 )
 
 app.include_router(generate.router, prefix="/api", tags=["Generate"])
+app.include_router(jobs.router, prefix="/api", tags=["Jobs"])
 app.include_router(download.router, prefix="/api", tags=["Download"])
 app.include_router(health.router, prefix="/api", tags=["Health"])
+app.include_router(metrics.router, prefix="/api", tags=["Health"])
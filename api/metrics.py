@@ -0,0 +1,275 @@
+import os
+import math
+import time
+import threading
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from fastapi import HTTPException
+
+from api.artifacts import get_artifact_store
+from api.cache import result_cache
+from api.jobs import get_job_manager
+from api.loger import get_logger
+from core.compiler import compiled_blueprints
+
+
+logger = get_logger(__name__)
+
+# Формат текстовой выдачи Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+THROUGHPUT_BUCKETS = (1e3, 5e3, 1e4, 2.5e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6)
+
+# Имена сущностей приходят от клиентов: сверх лимита они попадают в метку "_other"
+METRICS_MAX_ENTITIES = int(os.getenv("SDG_METRICS_MAX_ENTITIES", "100"))
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Shard:
+    """Значения метрик, обновляемые одним потоком."""
+
+    __slots__ = ("values", "histograms")
+
+    def __init__(self):
+        # (метрика, метки) -> значение счётчика или gauge
+        self.values: Dict[Tuple[str, Labels], float] = {}
+        # (метрика, метки) -> [число наблюдений в каждой корзине..., в +Inf, сумма]
+        self.histograms: Dict[Tuple[str, Labels], List[float]] = {}
+
+    def merge(self, other: "_Shard"):
+        """Добавить значения other (шард завершившегося потока или копию живого)."""
+        for key, value in other.values.copy().items():
+            self.values[key] = self.values.get(key, 0) + value
+        for key, counts in other.histograms.copy().items():
+            total = self.histograms.get(key)
+            if total is None:
+                self.histograms[key] = list(counts)
+            else:
+                self.histograms[key] = [a + b for a, b in zip(total, counts)]
+
+
+class MetricsRegistry:
+    """
+    Счётчики, gauge и гистограммы в текстовом формате Prometheus.
+
+    Каждый поток пишет в собственный шард (threading.local), поэтому обновление
+    метрики не берёт блокировку: она нужна только при появлении нового потока
+    и при сборке выдачи, которая суммирует шарды. Шарды завершившихся потоков
+    (anyio закрывает простаивающие воркеры threadpool) сливаются в общий итог,
+    поэтому их число не превышает числа живых потоков. Значения, которые дешевле
+    прочитать, чем поддерживать (размеры кэшей, очередь задач), снимаются
+    коллекторами в момент выдачи.
+    """
+
+    def __init__(self):
+        # имя -> (тип, описание, границы корзин)
+        self._metrics: Dict[str, Tuple[str, str, Tuple[float, ...]]] = {}
+        self._collectors: List[Tuple[str, Callable[[], Iterable[Tuple[Dict[str, str], float]]]]] = []
+        self._shards: List[Tuple[threading.Thread, _Shard]] = []
+        # Итог шардов завершившихся потоков
+        self._retired = _Shard()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, description: str):
+        self._metrics[name] = ("counter", description, ())
+
+    def gauge(self, name: str, description: str):
+        self._metrics[name] = ("gauge", description, ())
+
+    def histogram(self, name: str, description: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self._metrics[name] = ("histogram", description, tuple(sorted(buckets)))
+
+    def collector(self, name: str, collect: Callable[[], Iterable[Tuple[Dict[str, str], float]]]):
+        """collect() возвращает пары (метки, значение) метрики name на момент выдачи."""
+        self._collectors.append((name, collect))
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard()
+            with self._lock:
+                self._prune()
+                self._shards.append((threading.current_thread(), shard))
+            self._local.shard = shard
+        return shard
+
+    def _prune(self):
+        """Слить шарды завершившихся потоков в _retired (под self._lock)."""
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                self._retired.merge(shard)
+        self._shards = alive
+
+    def inc(self, name: str, value: float = 1, **labels: str):
+        """Увеличить счётчик (или gauge — value может быть отрицательным)."""
+        values = self._shard().values
+        key = (name, _labels(labels))
+        values[key] = values.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str):
+        """Добавить наблюдение в гистограмму."""
+        buckets = self._metrics[name][2]
+        histograms = self._shard().histograms
+        key = (name, _labels(labels))
+        counts = histograms.get(key)
+        if counts is None:
+            counts = histograms[key] = [0] * (len(buckets) + 2)
+        counts[bisect_left(buckets, value)] += 1
+        counts[-1] += value
+
+    def _collect(self) -> Tuple[Dict[Tuple[str, Labels], float], Dict[Tuple[str, Labels], List[float]]]:
+        total = _Shard()
+        with self._lock:
+            self._prune()
+            total.merge(self._retired)
+            shards = [shard for _, shard in self._shards]
+        for shard in shards:
+            # copy() словаря атомарна под GIL — поток-владелец может продолжать запись
+            total.merge(shard)
+        values, histograms = total.values, total.histograms
+
+        for name, collect in self._collectors:
+            try:
+                for labels, value in collect():
+                    values[(name, _labels(labels))] = value
+            except Exception as e:
+                logger.exception(f"❌ Ошибка сбора метрики {name}: {e}")
+        return values, histograms
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus."""
+        values, histograms = self._collect()
+        samples: Dict[str, List[Tuple[Labels, float]]] = {}
+        for (name, labels), value in values.items():
+            samples.setdefault(name, []).append((labels, value))
+        series: Dict[str, List[Tuple[Labels, List[float]]]] = {}
+        for (name, labels), counts in histograms.items():
+            series.setdefault(name, []).append((labels, counts))
+
+        lines = []
+        for name, (kind, description, buckets) in self._metrics.items():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind != "histogram":
+                for labels, value in sorted(samples.get(name, [])):
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                continue
+            for labels, counts in sorted(series.get(name, [])):
+                cumulative = 0
+                for bound, count in zip(buckets + (math.inf,), counts):
+                    cumulative += count
+                    bucket_labels = labels + (("le", _format_value(bound)),)
+                    lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(counts[-1])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+_entities = set()
+_entities_lock = threading.Lock()
+
+
+def entity_label(name: str) -> str:
+    """Метка сущности; число разных меток ограничено METRICS_MAX_ENTITIES."""
+    if name in _entities:
+        return name
+    with _entities_lock:
+        if len(_entities) < METRICS_MAX_ENTITIES:
+            _entities.add(name)
+            return name
+    return "_other"
+
+
+# Общий реестр метрик процесса API
+metrics = MetricsRegistry()
+metrics.counter("sdg_requests_total", "Запросы к API по маршруту и коду ответа")
+metrics.gauge("sdg_requests_in_progress", "Запросы, обрабатываемые в данный момент")
+metrics.histogram("sdg_request_duration_seconds", "Время обработки запроса, секунды", LATENCY_BUCKETS)
+metrics.counter("sdg_rows_generated_total", "Сгенерировано записей по сущностям")
+metrics.histogram(
+    "sdg_entity_rows_per_second", "Пропускная способность генерации сущности, записей в секунду", THROUGHPUT_BUCKETS
+)
+metrics.counter("sdg_artifact_bytes_written_total", "Записано байт в generated/ (вместе с gzip-вариантами)")
+metrics.gauge("sdg_artifact_bytes", "Суммарный размер артефактов в generated/ по индексу")
+metrics.counter("sdg_result_cache_requests_total", "Обращения к кэшу результатов (result=hit|miss)")
+metrics.counter("sdg_compiled_cache_requests_total", "Обращения к кэшу скомпилированных blueprint (result=hit|miss)")
+metrics.gauge("sdg_jobs", "Асинхронные задачи по статусу")
+
+metrics.collector(
+    "sdg_result_cache_requests_total",
+    lambda: [({"result": "hit"}, result_cache.hits), ({"result": "miss"}, result_cache.misses)]
+)
+metrics.collector(
+    "sdg_compiled_cache_requests_total",
+    lambda: [({"result": "hit"}, compiled_blueprints.hits), ({"result": "miss"}, compiled_blueprints.misses)]
+)
+metrics.collector("sdg_artifact_bytes", lambda: [({}, get_artifact_store().total_bytes())])
+metrics.collector(
+    "sdg_jobs", lambda: [({"status": status}, count) for status, count in get_job_manager().store.counts().items()]
+)
+
+
+def track_request(route: str):
+    """
+    Декоратор синхронного обработчика: число запросов по коду ответа,
+    время обработки и число одновременных запросов маршрута.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            metrics.inc("sdg_requests_in_progress", route=route)
+            start = time.perf_counter()
+            status = 500
+            try:
+                response = func(*args, **kwargs)
+                status = getattr(response, "status_code", 200)
+                return response
+            except HTTPException as e:
+                status = e.status_code
+                raise
+            finally:
+                metrics.inc("sdg_requests_in_progress", -1, route=route)
+                metrics.inc("sdg_requests_total", route=route, status=status)
+                metrics.observe("sdg_request_duration_seconds", time.perf_counter() - start, route=route)
+        return wrapper
+    return decorator
+
+
+def record_generation(counts: Dict[str, int], seconds: Dict[str, float]):
+    """Записи и пропускная способность по сущностям одной генерации."""
+    for name, rows in counts.items():
+        entity = entity_label(name)
+        metrics.inc("sdg_rows_generated_total", rows, entity=entity)
+        elapsed = seconds.get(name)
+        if elapsed:
+            metrics.observe("sdg_entity_rows_per_second", rows / elapsed, entity=entity)
@@ -1,16 +1,64 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response
 import os
 
+from api.artifacts import get_artifact_store, gzip_etag, gzip_path
+from api.metrics import track_request
+
 router = APIRouter()
 
 
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Разрешает ли Accept-Encoding ответ в gzip (с учётом q=0)."""
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
 @router.get("/download/{filename}")
-def download_file(filename: str):
+@track_request("download")
+def download_file(filename: str, request: Request):
     """
     Возвращает сгенерированный JSON файл по имени.
+    Отдаёт gzip-вариант, если клиент его принимает, поддерживает
+    If-None-Match (304) по хэшу содержимого и Range для докачки.
     """
-    path = os.path.join("generated", filename)
-    if not os.path.exists(path):
+    # Индекс артефактов заменяет проверку файла в каталоге и продлевает жизнь артефакта (LRU)
+    store = get_artifact_store()
+    artifact = store.touch(filename)
+    if artifact is None:
         raise HTTPException(status_code=404, detail="Файл не найден")
-    return FileResponse(path, filename=filename, media_type="application/json")
+
+    path = os.path.join(store.directory, filename)
+    # Запись в индексе могла пережить файл (удалён вручную или другим процессом)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Файл не найден")
+    etag = artifact["etag"]
+    compressed = gzip_path(path)
+    use_gzip = _accepts_gzip(request.headers.get("accept-encoding", "")) and os.path.exists(compressed)
+    headers = {"ETag": gzip_etag(etag) if use_gzip else etag, "Vary": "Accept-Encoding"}
+
+    if_none_match = request.headers.get("if-none-match")
+    # Сравниваем только с ETag отдаваемого представления: gzip и исходный JSON — разные байты
+    if if_none_match and _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return FileResponse(compressed, filename=filename, media_type="application/json", headers=headers)
+    # Range и If-Range обрабатывает FileResponse (по ETag из headers)
+    return FileResponse(path, filename=filename, media_type="application/json", headers=headers)
@@ -2,47 +2,153 @@ import os
 import json
 from uuid import uuid4
 import time
+from typing import Any, Dict, List, Optional, Union
 
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response, StreamingResponse
 
-from core.engine import DataGenerationEngine
-from core.models import GenerationRequest
-from core.validators import validate_one_to_many, validate_rules
+from core.compiler import CompiledBlueprint, compile_blueprint
+from core.engine import ENGINE_WORKERS, DataGenerationEngine
+from core.models import MAX_PREVIEW_ROWS, Blueprint, GenerationRequest, ResponseMode
+from core.tracing import NULL_TRACER, TRACE_ALL, Tracer
+from core.utils import columns_to_rows, iter_rows
+from api import GENERATED_DIR
+from api.artifacts import get_artifact_store, write_artifact
+from api.cache import result_cache
+from api.metrics import metrics, record_generation, track_request
+from api.serialization import dumps, envelope
 from api.loger import get_logger
 
 
 router = APIRouter()
 logger = get_logger(__name__)
 
+# Сколько NDJSON-строк отправлять клиенту одним куском
+STREAM_BATCH_SIZE = 500
+# Лимит записей (по всем сущностям) для POST /api/generate: результат, JSON и gzip-вариант
+# целиком в памяти. Большие blueprint — через /api/generate/stream или /api/jobs.
+MAX_SYNC_ROWS = int(os.getenv("SDG_MAX_SYNC_ROWS", "100000"))
+# Прежний лимит count сущности: blueprint, в которых все сущности в его пределах,
+# принимались и раньше, поэтому MAX_SYNC_ROWS к ним не применяется
+LEGACY_MAX_ENTITY_COUNT = 5000
 
-@router.post("/generate", response_class=JSONResponse)
+
+def _log_timings(tracer):
+    if tracer.enabled:
+        spans = ", ".join(f"{name}={span['ms']}ms×{span['calls']}" for name, span in tracer.summary().items())
+        logger.info(f"Тайминги генерации: {spans}")
+
+
+def _build_response(
+        request: GenerationRequest,
+        compiled: CompiledBlueprint,
+        filename: str,
+        payload: Optional[bytes],
+        cached: bool,
+        size: int,
+        preview: Dict[str, List[Any]],
+        tracer=NULL_TRACER
+        ) -> Response:
+    """
+    Ответ в режиме request.response_mode:
+    inline — data целиком (байты payload вставляются как есть);
+    file — ссылка и число записей сущностей;
+    summary — ещё размер результата size и первые preview_rows записей
+    каждой сущности из preview (не больше MAX_PREVIEW_ROWS).
+    С request.timings в ответ добавляется блок timings.
+    """
+    download_url = f"/api/download/{filename}"
+    extra = {"timings": tracer.summary()} if request.timings else {}
+    if request.response_mode == ResponseMode.INLINE:
+        return Response(
+            envelope(payload, download_url=download_url, cached=cached, **extra),
+            media_type="application/json"
+        )
+
+    body = {
+        "status": "success",
+        "download_url": download_url,
+        "cached": cached,
+        "counts": {name: compiled.entities[name].count for name in compiled.order},
+    }
+    if request.response_mode == ResponseMode.SUMMARY:
+        body["bytes"] = size
+        body["preview"] = {name: rows[:request.preview_rows] for name, rows in preview.items()}
+    body.update(extra)
+    return Response(dumps(body), media_type="application/json")
+
+
+@router.post("/generate", response_class=Response)
+@track_request("generate")
 def generate_data(request: GenerationRequest):
     """
     Генерирует данные на основе переданного blueprint.
-    Возвращает результат и ссылку для скачивания файла.
+    Возвращает ссылку для скачивания файла и результат — целиком,
+    без него или краткую сводку, в зависимости от response_mode.
     """
     start_time = time.time()
+    tracer = Tracer() if request.timings or TRACE_ALL else NULL_TRACER
     try:
         logger.info(f"Запрос на генерацию: seed={request.seed}, entities={list(request.blueprint.entities.keys())}")
-        validate_one_to_many(request.blueprint)
-        validate_rules(request.blueprint)
+        # Валидация и подготовка blueprint кэшируются по его хэшу
+        with tracer.span("compile"):
+            compiled = compile_blueprint(request.blueprint, tracer)
+        counts = [entity.count for entity in compiled.entities.values()]
+        total_rows = sum(counts)
+        if max(counts, default=0) > LEGACY_MAX_ENTITY_COUNT and total_rows > MAX_SYNC_ROWS:
+            raise ValueError(
+                f"Blueprint содержит {total_rows} записей, больше лимита синхронной генерации "
+                f"{MAX_SYNC_ROWS}: используйте /api/generate/stream или /api/jobs"
+            )
+
+        # При заданном seed результат детерминирован — отдаём уже записанный файл
+        cache_key = result_cache.key(request)
+        cached = result_cache.lookup(cache_key) if cache_key else None
+        if cached:
+            logger.info(f"Результат взят из кэша: {cached.filename}")
+            get_artifact_store().touch(cached.filename)
+            payload = None
+            # Файл читается только для inline; summary берёт размер и preview из записи кэша
+            if request.response_mode == ResponseMode.INLINE:
+                with tracer.span("cache_read"):
+                    with open(os.path.join(GENERATED_DIR, cached.filename), "rb") as f:
+                        payload = f.read()
+            _log_timings(tracer)
+            return _build_response(
+                request, compiled, cached.filename, payload, cached=True,
+                size=cached.size, preview=json.loads(cached.preview), tracer=tracer
+            )
 
-        engine = DataGenerationEngine(request.seed)
-        data = engine.execute(request.blueprint)
+        engine = DataGenerationEngine(request.seed, workers=ENGINE_WORKERS, tracer=tracer)
+        # Колонки, а не execute(): embed-поля остаются EmbeddedRows и собираются только в dumps
+        columns = engine.execute(compiled, columnar=True)
+        with tracer.span("rows"):
+            data = {name: columns_to_rows(entity) for name, entity in columns.items()}
+        record_generation(
+            {name: compiled.entities[name].count for name in compiled.order}, engine.entity_seconds
+        )
 
-        os.makedirs("generated", exist_ok=True)
+        # Датасет сериализуется один раз: эти же байты пишутся в файл и уходят в ответ
+        with tracer.span("serialize"):
+            payload = dumps(data)
+        os.makedirs(GENERATED_DIR, exist_ok=True)
         filename = f"blueprint_{uuid4().hex}.json"
-        file_path = os.path.join("generated", filename)
+        file_path = os.path.join(GENERATED_DIR, filename)
+
+        with tracer.span("write_artifact"):
+            etag, size = write_artifact(file_path, payload)
+            get_artifact_store().register(filename, etag, size, blueprint_hash=compiled.key)
+        metrics.inc("sdg_artifact_bytes_written_total", size)
 
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+        preview = {name: rows[:MAX_PREVIEW_ROWS] for name, rows in data.items()}
+        if cache_key:
+            result_cache.put(cache_key, filename, len(payload), preview=dumps(preview))
 
-        return {
-            "status": "success",
-            "data": data,
-            "download_url": f"/api/download/{filename}"
-        }
+        _log_timings(tracer)
+        return _build_response(
+            request, compiled, filename, payload, cached=False,
+            size=len(payload), preview=preview, tracer=tracer
+        )
 
     except Exception as e:
         elapsed = round(time.time() - start_time, 2)
@@ -50,12 +156,57 @@ def generate_data(request: GenerationRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+def _ndjson_stream(engine: DataGenerationEngine, blueprint: Union[Blueprint, CompiledBlueprint]):
+    """
+    Отдаёт записи кусками по мере генерации: одна JSON-запись на строку,
+    {"entity": <имя сущности>, "data": <запись>}.
+    """
+    start_time = time.time()
+    try:
+        for entity_name, columns in engine.execute_iter(blueprint):
+            prefix = b'{"entity":' + dumps(entity_name) + b',"data":'
+            batch = []
+            for row in iter_rows(columns):
+                batch.append(prefix + dumps(row) + b"}\n")
+                if len(batch) >= STREAM_BATCH_SIZE:
+                    yield b"".join(batch)
+                    batch = []
+            if batch:
+                yield b"".join(batch)
+    except Exception as e:
+        # Статус ответа уже отправлен — остаётся только залогировать и оборвать поток
+        elapsed = round(time.time() - start_time, 2)
+        logger.exception(f"❌ Ошибка при потоковой генерации ({elapsed}s): {e}")
+        raise
+
+
+@router.post("/generate/stream")
+def generate_data_stream(request: GenerationRequest):
+    """
+    Потоковая генерация: записи отправляются в формате NDJSON сразу после
+    генерации каждой сущности, без сохранения результата на диск.
+    """
+    try:
+        logger.info(
+            f"Запрос на потоковую генерацию: seed={request.seed}, "
+            f"entities={list(request.blueprint.entities.keys())}"
+        )
+        compiled = compile_blueprint(request.blueprint)
+    except Exception as e:
+        logger.exception(f"❌ Ошибка валидации blueprint: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    engine = DataGenerationEngine(request.seed, workers=ENGINE_WORKERS)
+    return StreamingResponse(
+        _ndjson_stream(engine, compiled),
+        media_type="application/x-ndjson"
+    )
+
+
 @router.post("/validate")
 async def validate(req: GenerationRequest):
     try:
-        blueprint = req.blueprint
-        validate_rules(blueprint)
-        validate_one_to_many(blueprint)
+        compile_blueprint(req.blueprint)
         return {"status": "valid", "message": "Blueprint is valid"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
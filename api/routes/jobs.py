@@ -0,0 +1,65 @@
+from fastapi import APIRouter, HTTPException
+
+from core.models import GenerationRequest
+from core.compiler import compile_blueprint
+from api.jobs import DONE, FAILED, get_job_manager
+from api.loger import get_logger
+
+
+router = APIRouter()
+logger = get_logger(__name__)
+
+
+def _job_status(job: dict) -> dict:
+    status = {
+        "job_id": job["id"],
+        "status": job["status"],
+        "progress": job["progress"],
+    }
+    if job["status"] == DONE:
+        status["download_url"] = f"/api/download/{job['filename']}"
+    if job["status"] == FAILED:
+        status["error"] = job["error"]
+    return status
+
+
+@router.post("/jobs", status_code=202)
+def submit_job(request: GenerationRequest):
+    """
+    Ставит генерацию в очередь и сразу возвращает id задачи.
+    Генерация выполняется в отдельном процессе пула.
+    """
+    try:
+        compile_blueprint(request.blueprint)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    job_id = get_job_manager().submit(request)
+    logger.info(f"Задача {job_id} поставлена в очередь: entities={list(request.blueprint.entities.keys())}")
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/api/jobs/{job_id}",
+    }
+
+
+@router.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    """Статус и прогресс задачи (доля сгенерированных записей)."""
+    job = get_job_manager().store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    return _job_status(job)
+
+
+@router.get("/jobs/{job_id}/result")
+def job_result(job_id: str):
+    """Ссылка на результат задачи в /api/download."""
+    job = get_job_manager().store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    if job["status"] == FAILED:
+        raise HTTPException(status_code=400, detail=job["error"])
+    if job["status"] != DONE:
+        raise HTTPException(status_code=409, detail="Задача ещё не завершена")
+    return _job_status(job)
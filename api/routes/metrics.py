@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from api.metrics import CONTENT_TYPE, metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+def get_metrics():
+    """
+    Метрики API в текстовом формате Prometheus.
+    """
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,51 @@
+import json
+import os
+from typing import Any
+
+from core.utils import EmbeddedRows
+
+try:
+    import orjson
+except ImportError:  # orjson — необязательная зависимость
+    orjson = None
+
+
+# auto — orjson, если установлен; json — всегда стандартный модуль
+JSON_BACKEND = os.getenv("SDG_JSON_BACKEND", "auto")
+
+
+def _use_orjson() -> bool:
+    if JSON_BACKEND == "orjson" and orjson is None:
+        raise RuntimeError("SDG_JSON_BACKEND=orjson, но пакет orjson не установлен")
+    return orjson is not None and JSON_BACKEND != "json"
+
+
+def _default(obj: Any) -> Any:
+    # Вложенные записи embed собираются только здесь — по одному родителю за раз
+    if isinstance(obj, EmbeddedRows):
+        return obj.to_list()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Компактный JSON в UTF-8. Один и тот же результат пишется в файл
+    и вставляется в ответ, поэтому датасет сериализуется ровно один раз.
+    """
+    if _use_orjson():
+        try:
+            return orjson.dumps(obj, default=_default)
+        except TypeError:
+            # orjson не кодирует целые вне 64 бит (integer с большими границами) — их пишет json
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def envelope(data: bytes, **fields: Any) -> bytes:
+    """
+    Ответ {"status": "success", "data": <data>, **fields} из уже сериализованных данных:
+    data вставляется как есть, без повторного разбора и кодирования.
+    """
+    head = dumps({"status": "success"})[:-1]
+    tail = dumps(fields)[1:] if fields else b"}"
+    return head + b',"data":' + data + (b"," + tail if fields else tail)
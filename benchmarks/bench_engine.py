@@ -0,0 +1,226 @@
+"""
+Бенчмарк DataGenerationEngine на матрице синтетических blueprint.
+
+Измерения варьируют по одному от базового случая (--full — полное произведение):
+число записей, число полей каждого типа, fan-out ссылок (дочерних записей на родителя),
+one_to_many с embed и без, число правил. Для каждого случая — записи/сек,
+пиковая память (tracemalloc, отдельным прогоном) и время фаз:
+compile → generate (колонки) → rows (записи) → serialize (JSON).
+
+    python -m benchmarks.bench_engine --output bench.json
+    python -m benchmarks.bench_engine --baseline bench.json --threshold 0.2
+"""
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from api.serialization import dumps
+from core import __version__
+from core.compiler import BlueprintCache
+from core.engine import DataGenerationEngine
+from core.models import Blueprint
+from core.utils import columns_to_rows
+
+FIELD_TYPES = ("string", "integer", "float", "boolean", "uuid", "email")
+
+BASE_CASE = {"rows": 10000, "fields": 2, "fanout": 2, "embed": False, "rules": 0}
+AXES = {
+    "rows": [1000, 10000, 100000],
+    "fields": [1, 2, 8],
+    "fanout": [0, 2, 10],
+    "embed": [False, True],
+    "rules": [0, 2, 8],
+}
+
+
+def make_blueprint(rows: int, fields: int, fanout: int, embed: bool, rules: int) -> Blueprint:
+    """
+    users: rows записей, по fields полей каждого типа.
+    orders: rows * fanout записей со ссылкой на users и one_to_many в users (fanout=0 — без orders).
+    rules: правила orders с условием по числовым полям users.
+    """
+    user_fields: Dict[str, Any] = {"id": {"type": "uuid"}}
+    for field_type, idx in itertools.product(FIELD_TYPES, range(fields)):
+        user_fields[f"{field_type}_{idx}"] = {"type": field_type}
+    entities: Dict[str, Any] = {"users": {"count": rows, "fields": user_fields}}
+
+    if fanout:
+        user_fields["orders"] = {
+            "type": "one_to_many",
+            "params": {"entity": "orders", "foreign_field": "user_id", "embed": embed},
+        }
+        entities["orders"] = {
+            "count": rows * fanout,
+            "fields": {
+                "id": {"type": "integer", "params": {"min": 1, "max": 10 ** 9}},
+                "user_id": {"type": "reference", "params": {"entity": "users", "field": "id"}},
+                "total": {"type": "float", "params": {"min": 1, "max": 1000}},
+            },
+            "rules": [
+                {
+                    "if": {
+                        "entity": "users", "local_field": "user_id", "field": f"integer_{idx % fields}",
+                        "op": "gt" if idx % 2 else "lt", "value": 5000,
+                    },
+                    "then": {"action": "set" if idx % 2 else "adjust", "field": "total", "min": 100, "max": 500},
+                }
+                for idx in range(rules if fields else 0)
+            ],
+        }
+    return Blueprint.from_dict({"entities": entities})
+
+
+def case_name(params: Dict[str, Any]) -> str:
+    return ",".join(f"{key}={params[key]}" for key in BASE_CASE)
+
+
+def build_matrix(full: bool = False, scale: float = 1.0) -> List[Dict[str, Any]]:
+    """Случаи бенчмарка; scale умножает число записей (--quick — 0.1)."""
+    if full:
+        cases = [dict(zip(AXES, values)) for values in itertools.product(*AXES.values())]
+    else:
+        cases = [{**BASE_CASE, axis: value} for axis, values in AXES.items() for value in values]
+
+    unique = {}
+    for params in cases:
+        params = {**params, "rows": max(1, int(params["rows"] * scale))}
+        if not params["fanout"]:
+            # Без дочерней сущности embed и правила не участвуют
+            params.update(embed=False, rules=0)
+        unique.setdefault(case_name(params), params)
+    return list(unique.values())
+
+
+def run_once(blueprint: Blueprint, seed: int) -> Dict[str, float]:
+    """Один прогон с временем фаз в секундах."""
+    phases = {}
+    start = time.perf_counter()
+    # Свежий кэш: компиляция измеряется как для нового blueprint
+    compiled = BlueprintCache().get(blueprint)
+    phases["compile"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    columns = DataGenerationEngine(seed=seed).execute(compiled, columnar=True)
+    phases["generate"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rows = {name: columns_to_rows(entity_columns) for name, entity_columns in columns.items()}
+    phases["rows"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    dumps(rows)
+    phases["serialize"] = time.perf_counter() - start
+    return phases
+
+
+def peak_memory_mb(blueprint: Blueprint, seed: int) -> float:
+    tracemalloc.start()
+    try:
+        run_once(blueprint, seed)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024 ** 2
+
+
+def bench_case(params: Dict[str, Any], repeat: int, seed: int = 42, memory: bool = True) -> Dict[str, Any]:
+    blueprint = make_blueprint(**params)
+    total_rows = sum(entity.count for entity in blueprint.entities.values())
+    runs = [run_once(blueprint, seed) for _ in range(repeat)]
+    phases = {phase: statistics.median(run[phase] for run in runs) for phase in runs[0]}
+    seconds = sum(phases.values())
+    return {
+        "name": case_name(params),
+        "params": params,
+        "rows": total_rows,
+        "seconds": round(seconds, 6),
+        "rows_per_sec": round(total_rows / seconds, 1),
+        "peak_mb": round(peak_memory_mb(blueprint, seed), 2) if memory else None,
+        "phases": {phase: round(value, 6) for phase, value in phases.items()},
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Регрессии относительно baseline: падение записей/сек или рост пиковой памяти больше threshold."""
+    previous = {case["name"]: case for case in baseline["cases"]}
+    regressions = []
+    for case in results["cases"]:
+        before = previous.get(case["name"])
+        if before is None:
+            continue
+        if case["rows_per_sec"] < before["rows_per_sec"] * (1 - threshold):
+            regressions.append(
+                f"{case['name']}: rows/sec {before['rows_per_sec']:.0f} -> {case['rows_per_sec']:.0f}"
+            )
+        if case["peak_mb"] and before.get("peak_mb") and case["peak_mb"] > before["peak_mb"] * (1 + threshold):
+            regressions.append(f"{case['name']}: peak {before['peak_mb']:.1f} MB -> {case['peak_mb']:.1f} MB")
+    return regressions
+
+
+def run(
+        cases: List[Dict[str, Any]],
+        repeat: int,
+        memory: bool = True,
+        log=print
+        ) -> Dict[str, Any]:
+    results = {
+        "meta": {
+            "version": __version__,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": repeat,
+        },
+        "cases": [],
+    }
+    # Прогрев: пулы значений и Faker строятся один раз на процесс и не должны попасть в первый случай
+    run_once(make_blueprint(rows=10, fields=1, fanout=1, embed=False, rules=1), seed=0)
+    for params in cases:
+        case = bench_case(params, repeat, memory=memory)
+        results["cases"].append(case)
+        phases = " ".join(f"{phase}={value * 1000:.1f}ms" for phase, value in case["phases"].items())
+        peak = f"{case['peak_mb']:8.1f} MB" if case["peak_mb"] is not None else "       - MB"
+        log(f"{case['name']:55} {case['rows']:>9} rows {case['rows_per_sec']:>12.0f} rows/s {peak}  {phases}")
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="прогонов на случай (берётся медиана)")
+    parser.add_argument("--full", action="store_true", help="полное произведение измерений")
+    parser.add_argument("--quick", action="store_true", help="в 10 раз меньше записей")
+    parser.add_argument("--no-memory", action="store_true", help="не измерять пиковую память")
+    parser.add_argument("--output", help="сохранить результаты в JSON")
+    parser.add_argument("--baseline", help="JSON прошлого прогона для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.2, help="допустимое ухудшение (доля)")
+    args = parser.parse_args(argv)
+
+    cases = build_matrix(full=args.full, scale=0.1 if args.quick else 1.0)
+    results = run(cases, args.repeat, memory=not args.no_memory)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print("Регрессий относительно baseline нет")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Задержка небольшого запроса на «холодном» и «прогретом» процессе.
+
+Холодный запрос — как первый запрос после старта без прогрева: пул Faker,
+пулы значений и кэш скомпилированных blueprint пусты. Прогретый — после
+warm_up() из api/main.py, как при обычном старте приложения.
+
+    python -m benchmarks.bench_startup --repeat 20 --locale en_US
+"""
+import argparse
+import statistics
+import time
+
+from core.compiler import compiled_blueprints
+from core.engine import DataGenerationEngine
+from core.faker_pool import faker_pool
+from core.models import Blueprint
+from core.pools import POOLED_SUBTYPES, value_pools
+
+BLUEPRINT = {"entities": {
+    "users": {"count": 20, "fields": {
+        "id": {"type": "uuid"},
+        "name": {"type": "string", "params": {"subtype": "name"}},
+        "email": {"type": "email"},
+        "age": {"type": "integer", "params": {"min": 18, "max": 90}},
+    }},
+    "orders": {"count": 50, "fields": {
+        "id": {"type": "integer"},
+        "user_id": {"type": "reference", "params": {"entity": "users", "field": "id"}},
+        "total": {"type": "float", "params": {"min": 1, "max": 500}},
+    }},
+}}
+
+
+def reset():
+    faker_pool.clear()
+    value_pools.clear()
+    compiled_blueprints.clear()
+
+
+def warm(locale: str):
+    faker_pool.warm([locale])
+    for subtype in POOLED_SUBTYPES:
+        value_pools.get(locale, subtype)
+
+
+def request_ms(blueprint: Blueprint, locale: str, seed: int) -> float:
+    start = time.perf_counter()
+    DataGenerationEngine(seed=seed, locale=locale).execute(blueprint)
+    return (time.perf_counter() - start) * 1000
+
+
+def run(repeat: int, locale: str):
+    blueprint = Blueprint.from_dict(BLUEPRINT)
+
+    cold = []
+    for seed in range(repeat):
+        reset()
+        cold.append(request_ms(blueprint, locale, seed))
+
+    reset()
+    start = time.perf_counter()
+    warm(locale)
+    warm_up_ms = (time.perf_counter() - start) * 1000
+    warm_runs = [request_ms(blueprint, locale, seed) for seed in range(repeat)]
+
+    print(f"locale={locale} repeat={repeat}")
+    print(f"warm-up:        {warm_up_ms:9.1f} ms (однократно при старте)")
+    for name, samples in (("cold request", cold), ("warm request", warm_runs)):
+        print(
+            f"{name + ':':15} median {statistics.median(samples):7.2f} ms, "
+            f"min {min(samples):7.2f} ms, max {max(samples):7.2f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--locale", default="en_US")
+    args = parser.parse_args()
+    run(args.repeat, args.locale)
+
+
+if __name__ == "__main__":
+    main()
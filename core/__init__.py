@@ -1,3 +1,6 @@
+# Версия генератора: меняется, если при том же seed меняется результат генерации
+__version__ = "1.1.0"
+
 from .registry import registry
 
 from .engine import DataGenerationEngine
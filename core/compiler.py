@@ -0,0 +1,215 @@
+import os
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Set, Tuple, Type
+
+from .fields import FieldValueGenerator
+from .models import Blueprint, EntityDefinition, FieldDefinition, FieldType
+from .registry import registry
+from .rules import CompiledRule, compile_rules
+from .tracing import NULL_TRACER
+from .utils import blueprint_hash
+from .validators import validate_one_to_many, validate_rules
+
+
+# Сколько скомпилированных blueprint держать в памяти
+COMPILED_CACHE_ENTRIES = int(os.getenv("SDG_COMPILED_CACHE_ENTRIES", "128"))
+
+
+def topo_levels(blueprint) -> List[List[str]]:
+    """
+    Разбивает сущности на уровни зависимостей по reference-полям.
+    Сущности одного уровня не зависят друг от друга и могут генерироваться параллельно:
+    уровень 0 — независимые (users, products), уровень 1 — ссылающиеся только на них (orders) и т.д.
+    """
+    graph = defaultdict(list)
+    indegree = defaultdict(int)
+
+    for entity_name, entity_def in blueprint.entities.items():
+        indegree.setdefault(entity_name, 0)
+        for field_def in entity_def.fields.values():
+            if field_def.type.name == "REFERENCE":
+                ref_entity = field_def.params.get("entity")
+                if ref_entity:
+                    graph[ref_entity].append(entity_name)
+                    indegree[entity_name] += 1
+
+    # Топологическая сортировка (Kahn’s algorithm) с разбиением на уровни
+    level = [name for name, deg in indegree.items() if deg == 0]
+    levels = []
+    visited = 0
+
+    while level:
+        levels.append(level)
+        visited += len(level)
+        next_level = []
+        for node in level:
+            for dependent in graph[node]:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    next_level.append(dependent)
+        level = next_level
+
+    if visited != len(indegree):
+        raise ValueError("Обнаружена циклическая зависимость между сущностями")
+
+    return levels
+
+
+def topo_sort(blueprint) -> List[str]:
+    """
+    Выполняет топологическую сортировку сущностей по зависимостям reference-полей.
+    Нужно, чтобы сначала генерировать независимые сущности (users), а потом зависимые (orders).
+    """
+    return [name for level in topo_levels(blueprint) for name in level]
+
+
+def retained_fields(blueprint: Blueprint) -> Dict[str, Set[str]]:
+    """
+    Какие колонки каждой сущности нужны последующим этапам генерации:
+    поля, на которые ссылаются reference, и поля из условий rules (плюс id для индекса).
+    """
+    keep: Dict[str, Set[str]] = defaultdict(set)
+    for entity_def in blueprint.entities.values():
+        for field_def in entity_def.fields.values():
+            if field_def.type == FieldType.REFERENCE:
+                keep[field_def.params["entity"]].add(field_def.params["field"])
+        for rule in getattr(entity_def, "rules", []):
+            keep[rule.if_.entity].update({"id", rule.if_.field})
+    return keep
+
+
+def _check_one_to_many(fdef: FieldDefinition, blueprint: Blueprint):
+    child_entity = fdef.params["entity"]
+    foreign_field = fdef.params["foreign_field"]
+    child_def = blueprint.entities[child_entity]
+
+    if foreign_field not in child_def.fields:
+        raise ValueError(
+            f"Поле '{foreign_field}' отсутствует в сущности '{child_entity}'"
+        )
+
+    foreign_field_def = child_def.fields[foreign_field]
+    if foreign_field_def.type.name != "REFERENCE":
+        raise ValueError(
+            f"Поле '{foreign_field}' в '{child_entity}' должно быть типа REFERENCE, "
+            f"а не {foreign_field_def.type.name}"
+        )
+
+
+class CompiledField:
+    """Поле сущности с уже найденным в реестре классом генератора."""
+
+    __slots__ = ("name", "type", "params", "generator_cls")
+
+    def __init__(self, name: str, definition: FieldDefinition):
+        self.name = name
+        self.type = definition.type
+        self.params = definition.params
+        self.generator_cls: Type[FieldValueGenerator] = registry.get_generator(definition.type)
+
+
+def compile_fields(definition: Dict[str, FieldDefinition]) -> Dict[str, CompiledField]:
+    return {fname: CompiledField(fname, fdef) for fname, fdef in definition.items()}
+
+
+class CompiledEntity:
+    """Сущность blueprint: число записей, скомпилированные поля и правила."""
+
+    def __init__(self, name: str, definition: EntityDefinition):
+        self.name = name
+        self.count = definition.count
+        self.fields = compile_fields(definition.fields)
+        self.rules: List[CompiledRule] = compile_rules(getattr(definition, "rules", []))
+
+
+class CompiledBlueprint:
+    """
+    Проверенный blueprint, подготовленный к генерации: уровни topo sort,
+    удерживаемые колонки, связи one_to_many, классы генераторов и правила.
+    Не содержит состояния ГСЧ — один объект используется запросами с любым seed.
+    """
+
+    def __init__(self, blueprint: Blueprint, key: str = None, tracer=NULL_TRACER):
+        with tracer.span("validate"):
+            validate_one_to_many(blueprint)
+            validate_rules(blueprint)
+
+        self.blueprint = blueprint
+        self.key = key or blueprint_hash(blueprint)
+        with tracer.span("topo_sort"):
+            self.levels = topo_levels(blueprint)
+        self.order = [name for level in self.levels for name in level]
+        self.keep = retained_fields(blueprint)
+
+        # (родитель, поле) -> FieldDefinition для всех one_to_many
+        self.relations: Dict[Tuple[str, str], FieldDefinition] = {
+            (parent, fname): fdef
+            for parent, parent_def in blueprint.entities.items()
+            for fname, fdef in parent_def.fields.items()
+            if fdef.type == FieldType.ONE_TO_MANY
+        }
+        for fdef in self.relations.values():
+            _check_one_to_many(fdef, blueprint)
+        self.deferred = [name for name in self.order if any(parent == name for parent, _ in self.relations)]
+        # Дочерние сущности с embed хранятся целиком: родители ссылаются на их записи по номеру
+        self.embedded = {
+            fdef.params["entity"] for fdef in self.relations.values() if fdef.params.get("embed", False)
+        }
+
+        self.entities: Dict[str, CompiledEntity] = {
+            name: CompiledEntity(name, entity_def)
+            for name, entity_def in blueprint.entities.items()
+        }
+
+
+class BlueprintCache:
+    """
+    Кэш скомпилированных blueprint по хэшу содержимого.
+    Повторные запросы с тем же blueprint (и любым seed) пропускают
+    валидацию, topo sort и поиск генераторов. Вытеснение LRU.
+    """
+
+    def __init__(self, max_entries: int = COMPILED_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CompiledBlueprint]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, blueprint: Blueprint, tracer=NULL_TRACER) -> CompiledBlueprint:
+        key = blueprint_hash(blueprint)
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+
+        # Компилируем вне блокировки: ошибки валидации не кэшируются
+        compiled = CompiledBlueprint(blueprint, key, tracer)
+        with self._lock:
+            self._entries[key] = compiled
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compiled
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Глобальный кэш скомпилированных blueprint
+compiled_blueprints = BlueprintCache()
+
+
+def compile_blueprint(blueprint: Blueprint, tracer=NULL_TRACER) -> CompiledBlueprint:
+    """Скомпилированный blueprint из кэша (компилируется при первом обращении)."""
+    if isinstance(blueprint, CompiledBlueprint):
+        return blueprint
+    return compiled_blueprints.get(blueprint, tracer)
@@ -0,0 +1,74 @@
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+
+class GenerationContext(dict):
+    """
+    Контекст генерации: {сущность: {поле: [значения...]}}.
+    Дополнительно кэширует производные структуры (компактные массивы колонок),
+    которые строятся один раз на сущность и сбрасываются при изменении колонок.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._arrays: Dict[Tuple[str, str], np.ndarray] = {}
+        self._indexes: Dict[Tuple[str, str], Dict[Any, int]] = {}
+
+    def __setitem__(self, entity: str, columns: Dict[str, List[Any]]):
+        super().__setitem__(entity, columns)
+        self.invalidate(entity)
+
+    def __reduce__(self):
+        # Кэши не сериализуются — в другом процессе (воркеры шардов) они строятся заново
+        return self.__class__, (dict(self),)
+
+    def set_column(self, entity: str, field: str, values: List[Any]):
+        """Заменить колонку сущности и сбросить зависящие от неё кэши."""
+        self[entity][field] = values
+        self.invalidate(entity, field)
+
+    def extend(self, entity: str, columns: Dict[str, List[Any]]):
+        """Дописать кусок колонок к сущности (execute_iter) и сбросить её кэши."""
+        stored = self.get(entity)
+        if stored is None:
+            self[entity] = {field: list(values) for field, values in columns.items()}
+            return
+        for field, values in columns.items():
+            stored.setdefault(field, []).extend(values)
+        self.invalidate(entity)
+
+    def invalidate(self, entity: str, field: str = None):
+        """Сбросить кэши сущности (или только одного её поля)."""
+        for cache in (self._arrays, self._indexes):
+            for key in [k for k in cache if k[0] == entity and (field is None or k[1] == field)]:
+                del cache[key]
+
+    def column_array(self, entity: str, field: str) -> np.ndarray:
+        """
+        Колонка сущности в виде массива numpy (dtype=object — значения
+        остаются исходными python-объектами), строится один раз.
+        """
+        key = (entity, field)
+        array = self._arrays.get(key)
+        if array is None:
+            column = self[entity][field]
+            array = np.empty(len(column), dtype=object)
+            array[:] = column
+            self._arrays[key] = array
+        return array
+
+    def key_index(self, entity: str, field: str = "id") -> Dict[Any, int]:
+        """
+        Индекс ключа сущности: значение поля -> позиция записи.
+        При повторяющихся ключах указывает на первую запись, None не индексируется.
+        """
+        key = (entity, field)
+        index = self._indexes.get(key)
+        if index is None:
+            index = {}
+            for pos, value in enumerate(self[entity].get(field, [])):
+                if value is not None:
+                    index.setdefault(value, pos)
+            self._indexes[key] = index
+        return index
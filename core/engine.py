@@ -1,163 +1,563 @@
-from typing import Dict, List, Any
-from collections import defaultdict, deque
+import multiprocessing
+import os
+import pickle
+import secrets
+import tempfile
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from uuid import uuid4
+from typing import Dict, Iterator, List, Any, Optional, Set, Tuple, Union
+from collections import OrderedDict, defaultdict, deque
+import numpy as np
 from faker import Faker
 
+# topo_levels, topo_sort и retained_fields переехали в compiler, импорт из engine сохранён
+from .compiler import (  # noqa: F401
+    CompiledBlueprint, CompiledEntity, CompiledField,
+    compile_blueprint, compile_fields, retained_fields, topo_levels, topo_sort
+)
+from .context import GenerationContext
+from .faker_pool import DEFAULT_LOCALE, SUPPORTED_LOCALES, faker_pool
 from .models import Blueprint, FieldDefinition, FieldType
+from .pools import WARM_VALUE_POOLS, value_pools
 from .registry import registry
-from .utils import match_condition, apply_action
+from .fields import FieldValueGenerator
+from .rules import CompiledRule
+from .tracing import NULL_TRACER, Tracer
+from .utils import EmbeddedRows, columns_to_rows, derive_seed, materialize_embedded
 
 
-def topo_sort(blueprint):
+def create_generators(
+        faker: Faker,
+        fields: Dict[str, CompiledField],
+        context: GenerationContext
+        ) -> Dict[str, FieldValueGenerator]:
     """
-    Выполняет топологическую сортировку сущностей по зависимостям reference-полей.
-    Нужно, чтобы сначала генерировать независимые сущности (users), а потом зависимые (orders).
+    Экземпляры генераторов для полей сущности: классы найдены при компиляции,
+    фабрики построены при регистрации — context получают только те, кому он нужен.
     """
-    graph = defaultdict(list)
-    indegree = defaultdict(int)
+    return {
+        fname: registry.create_from_class(
+            field.generator_cls,
+            faker,
+            field.params,
+            context=context,
+            field_name=fname
+        )
+        for fname, field in fields.items()
+    }
 
-    for entity_name, entity_def in blueprint.entities.items():
-        indegree.setdefault(entity_name, 0)
-        for field_def in entity_def.fields.values():
-            if field_def.type.name == "REFERENCE":
-                ref_entity = field_def.params.get("entity")
-                if ref_entity:
-                    graph[ref_entity].append(entity_name)
-                    indegree[entity_name] += 1
 
-    # Топологическая сортировка (Kahn’s algorithm)
-    queue = deque([name for name, deg in indegree.items() if deg == 0])
-    order = []
+def generate_shard(
+        faker: Faker,
+        fields: Dict[str, CompiledField],
+        count: int,
+        seed: int,
+        context: GenerationContext,
+        tracer=NULL_TRACER,
+        entity_name: str = ""
+        ) -> Dict[str, List[Any]]:
+    """
+    Генерирует один шард сущности. Faker пересидируется под-seed'ом шарда,
+    поэтому результат зависит только от seed, а не от того, где выполняется шард.
+    С включённым tracer время каждого генератора копится в интервале field:<сущность>.<поле>.
+    """
+    faker.seed_instance(seed)
+    generators = create_generators(faker, fields, context)
+    if not tracer.enabled:
+        return {fname: gen.generate_batch(count) for fname, gen in generators.items()}
+
+    columns = {}
+    for fname, gen in generators.items():
+        with tracer.span(f"field:{entity_name}.{fname}"):
+            columns[fname] = gen.generate_batch(count)
+    return columns
+
+
+# Число процессов для шардов в сервисе (/api/generate, поток, задачи); 1 — без пула
+ENGINE_WORKERS = int(os.getenv("SDG_ENGINE_WORKERS", "1"))
+# Сколько контекстов шардов (ссылочных колонок) процесс-воркер держит в памяти
+WORKER_CONTEXT_CACHE = 4
+
+# Контексты шардов в процессе-воркере: путь к файлу контекста -> контекст
+_worker_contexts: "OrderedDict[str, GenerationContext]" = OrderedDict()
+
+
+def _init_shard_worker(locales: Tuple[str, ...]):
+    """Инициализатор процесса пула: Faker и пулы значений строятся один раз на процесс."""
+    faker_pool.warm(locales)
+    if WARM_VALUE_POOLS:
+        value_pools.warm(locales)
+
+
+def _noop():
+    pass
+
+
+def _load_shard_context(path: str) -> GenerationContext:
+    """Контекст, опубликованный движком в файл, читается воркером один раз."""
+    context = _worker_contexts.get(path)
+    if context is not None:
+        _worker_contexts.move_to_end(path)
+        return context
+    with open(path, "rb") as f:
+        context = pickle.load(f)
+    _worker_contexts[path] = context
+    while len(_worker_contexts) > WORKER_CONTEXT_CACHE:
+        _worker_contexts.popitem(last=False)
+    return context
+
+
+class ShardExecutors:
+    """
+    Долгоживущие пулы процессов для шардов — по одному на число воркеров.
+    Процесс-воркер запускается (интерпретатор, импорты, Faker, пулы значений)
+    один раз, а не на каждый вызов execute_iter. Сломанный пул (воркер погиб)
+    отбрасывается, следующий запрос получает новый.
+    """
+
+    def __init__(self, locales: Tuple[str, ...] = SUPPORTED_LOCALES):
+        self.locales = locales
+        self._executors: Dict[int, ProcessPoolExecutor] = {}
+        self._lock = threading.Lock()
+
+    def get(self, workers: int) -> ProcessPoolExecutor:
+        with self._lock:
+            executor = self._executors.get(workers)
+            if executor is None:
+                executor = self._executors[workers] = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_shard_worker,
+                    initargs=(self.locales,)
+                )
+            return executor
+
+    def discard(self, executor: ProcessPoolExecutor):
+        with self._lock:
+            for workers, current in list(self._executors.items()):
+                if current is executor:
+                    del self._executors[workers]
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def warm(self, workers: int):
+        """Запустить процессы пула заранее (при старте приложения)."""
+        executor = self.get(workers)
+        wait([executor.submit(_noop) for _ in range(workers)])
 
-    while queue:
-        node = queue.popleft()
-        order.append(node)
-        for dependent in graph[node]:
-            indegree[dependent] -= 1
-            if indegree[dependent] == 0:
-                queue.append(dependent)
+    def shutdown(self):
+        with self._lock:
+            executors, self._executors = list(self._executors.values()), {}
+        for executor in executors:
+            executor.shutdown(cancel_futures=True)
 
-    if len(order) != len(indegree):
-        raise ValueError("Обнаружена циклическая зависимость между сущностями")
 
-    return order
+# Общие пулы шардов процесса
+shard_executors = ShardExecutors()
+
+
+def _shard_worker(
+        fields: Dict[str, CompiledField],
+        count: int,
+        seed: int,
+        context: Union[GenerationContext, str],
+        locale: str = DEFAULT_LOCALE,
+        trace: bool = False,
+        entity_name: str = ""
+        ) -> Tuple[Dict[str, List[Any]], Optional[Dict[str, List[float]]], float]:
+    """
+    Шард в процессе пула; вместе с колонками возвращаются интервалы трассировки
+    (или None) и время генерации шарда в секундах.
+    context — сам контекст или путь к файлу, в который его опубликовал движок.
+    """
+    if isinstance(context, str):
+        context = _load_shard_context(context)
+    tracer = Tracer() if trace else NULL_TRACER
+    # Faker берётся из пула рабочего процесса: создаётся один раз на процесс и локаль
+    with faker_pool.acquire(locale) as faker:
+        start = time.perf_counter()
+        with tracer.span("generate_entity"):
+            columns = generate_shard(faker, fields, count, seed, context, tracer, entity_name)
+    return columns, tracer.export() if trace else None, time.perf_counter() - start
 
 
 class DataGenerationEngine:
-    def __init__(self, seed: int = None):
+    # Размер куска по умолчанию для execute_iter
+    DEFAULT_CHUNK_SIZE = 10000
+    # Размер шарда — единицы генерации со своим под-seed'ом.
+    # От него (а не от числа воркеров) зависит результат при заданном seed.
+    DEFAULT_SHARD_SIZE = 10000
+
+    def __init__(
+            self,
+            seed: int = None,
+            workers: int = 1,
+            shard_size: int = DEFAULT_SHARD_SIZE,
+            locale: str = DEFAULT_LOCALE,
+            tracer=None
+            ):
+        if shard_size <= 0:
+            raise ValueError("shard_size должен быть положительным")
         self.seed = seed
-        self.faker = Faker()
-        if seed is not None:
-            import random
-            random.seed(seed)
-            self.faker.seed_instance(seed)
+        self.workers = max(1, workers)
+        self.shard_size = shard_size
+        self.locale = locale
+        # Трассировка фаз (core.tracing.Tracer); по умолчанию выключена и ничего не стоит
+        self.tracer = tracer or NULL_TRACER
+        # Суммарное время генерации шардов по сущностям (секунды) — для метрик пропускной способности.
+        # С пулом процессов время шардов складывается, а не берётся «по часам».
+        self.entity_seconds: Dict[str, float] = defaultdict(float)
+        # Шарды, отправленные в пул и ещё не полученные, и файлы опубликованных контекстов
+        self._inflight: Set[Future] = set()
+        self._context_files: List[str] = []
+        # Глобальный random не трогаем: все ГСЧ запроса (Faker, numpy, правила) —
+        # собственные и выводятся из базового seed, поэтому seeded-запросы
+        # воспроизводимы и при параллельном выполнении в потоках.
+        # Без seed базовый seed случайный, но общий для всего запуска.
+        self._base_seed = seed if seed is not None else secrets.randbits(64)
+        self._faker: Optional[Faker] = None
+
+    @property
+    def faker(self) -> Faker:
+        """Экземпляр Faker из пула, пересидированный под запрос; берётся при первом обращении."""
+        if self._faker is None:
+            self._faker = faker_pool.checkout(self.locale, seed=self._base_seed)
+        return self._faker
+
+    def close(self):
+        """Вернуть Faker в пул (execute_iter делает это сам по завершении)."""
+        if self._faker is not None:
+            faker_pool.release(self._faker)
+            self._faker = None
+
+    def _compile(self, blueprint: Union[Blueprint, CompiledBlueprint]) -> CompiledBlueprint:
+        if isinstance(blueprint, CompiledBlueprint):
+            return blueprint
+        with self.tracer.span("compile"):
+            return compile_blueprint(blueprint, self.tracer)
+
+    def _bind_entity_rules(self, entity: CompiledEntity):
+        """Скомпилированные правила сущности, у каждого — собственный ГСЧ запроса."""
+        return [
+            (rule, np.random.default_rng(derive_seed(self._base_seed, entity.name, "rules", idx)))
+            for idx, rule in enumerate(entity.rules)
+        ]
 
     def _apply_rules(
         self,
-        entity_name: str,
-        entity_data_list: List[Dict[str, Any]],
-        blueprint: Blueprint,
-        context: Dict[str, List[Dict[str, Any]]]
+        columns: Dict[str, List[Any]],
+        rules: List[Tuple[CompiledRule, np.random.Generator]],
+        context: GenerationContext
     ):
-        """Применяет правила rules для каждой записи сущности, используя match_condition и apply_action."""
-        entity_def = blueprint.entities[entity_name]
-        for entity_data in entity_data_list:
-            for rule in getattr(entity_def, "rules", []):
-                cond = rule.if_
-                action = rule.then
+        """
+        Применяет правила rules сущности над целыми колонками:
+        каждое правило компилируется в маску условия и пакетное действие.
+        """
+        for rule, rng in rules:
+            rule.apply(columns, context, rng)
 
-                if match_condition(entity_data, context, cond):
-                    apply_action(entity_data, self.faker, action)
+    def generate_entity_columns(
+            self,
+            entity_name: str,
+            definition: Dict[str, FieldDefinition],
+            count: int,
+            context: GenerationContext
+            ) -> Dict[str, List[Any]]:
+        """Генерирует сущность по колонкам: один вызов generate_batch на поле."""
+        generators = create_generators(self.faker, compile_fields(definition), context)
+        return {fname: gen.generate_batch(count) for fname, gen in generators.items()}
 
     def generate_entity(
             self,
             entity_name: str,
             definition: Dict[str, FieldDefinition],
             count: int,
-            context: Dict[str, List[Dict[str, Any]]]
+            context: GenerationContext
             ) -> List[Dict[str, Any]]:
-        results = []
-        generators = {
-            fname: registry.create_instance(
-                fdef.type.value,
-                self.faker,
-                fdef.params,
-                context=context if fdef.type == FieldType.REFERENCE else None,
-                field_name=fname
-            )
-            for fname, fdef in definition.items()
-        }
+        columns = self.generate_entity_columns(entity_name, definition, count, context)
+        return columns_to_rows(columns)
 
-        for _ in range(count):
-            entity_data = {fname: gen.generate() for fname, gen in generators.items()}
-            results.append(entity_data)
+    @staticmethod
+    def _index_children(
+            index: Dict[Any, List[Any]],
+            child_columns: Dict[str, List[Any]],
+            fdef: FieldDefinition,
+            offset: int = 0
+            ):
+        """
+        Добавляет кусок дочерней сущности в индекс one_to_many:
+        значение foreign_field -> [id детей] (или номера записей в контексте при embed;
+        offset — номер первой записи куска).
+        """
+        foreign_field = fdef.params["foreign_field"]
+        keys = child_columns[foreign_field]
+        if fdef.params.get("embed", False):
+            children = range(offset, offset + len(keys))
+        else:
+            children = child_columns.get("id") or [None] * len(keys)
 
-        return results
+        for key, child in zip(keys, children):
+            if key is None:
+                continue
+            index.setdefault(key, []).append(child)
 
     def _resolve_one_to_many(
             self,
-            context: Dict[str, List[Dict[str, Any]]],
+            context: GenerationContext,
             parent_entity: str, field_name: str, fdef: FieldDefinition,
-            blueprint: Blueprint
+            index: Dict[Any, List[Any]]
             ):
-        child_entity = fdef.params["entity"]
-        foreign_field = fdef.params["foreign_field"]
         parent_field = fdef.params.get("parent_field", "id")
         embed = bool(fdef.params.get("embed", False))
-        child_def = blueprint.entities[child_entity]
-
-        if foreign_field not in child_def.fields:
-            raise ValueError(
-                f"Поле '{foreign_field}' отсутствует в сущности '{child_entity}'"
-            )
-
-        foreign_field_def = child_def.fields[foreign_field]
-        if foreign_field_def.type.name != "REFERENCE":
-            raise ValueError(
-                f"Поле '{foreign_field}' в '{child_entity}' должно быть типа REFERENCE, "
-                f"а не {foreign_field_def.type.name}"
-            )
-        index = {}
-        for child in context.get(child_entity, []):
-            key = child.get(foreign_field)
-            if key is None:
-                continue
-            index.setdefault(key, []).append(child)
 
-        for parent in context.get(parent_entity, []):
-            children = index.get(parent.get(parent_field), [])
+        parent_columns = context[parent_entity]
+        parent_count = len(next(iter(parent_columns.values())))
+        # embed — ссылка на записи дочерней сущности в контексте, без копий
+        child_columns = context[fdef.params["entity"]] if embed else None
+        resolved = []
+        for key in parent_columns.get(parent_field) or [None] * parent_count:
+            children = index.get(key, [])
             if embed:
-                parent[field_name] = [child.copy() for child in children]
+                resolved.append(EmbeddedRows(child_columns, children))
             else:
-                parent[field_name] = [child.get("id") for child in children]
+                resolved.append(list(children))
+        context.set_column(parent_entity, field_name, resolved)
+
+    def _shard_context(
+            self,
+            fields: Dict[str, CompiledField],
+            context: GenerationContext
+            ) -> GenerationContext:
+        """Только ссылочные колонки, нужные шардам сущности, — их отправляем в воркеры."""
+        subset = GenerationContext()
+        for cfield in fields.values():
+            if cfield.type == FieldType.REFERENCE:
+                entity, field = cfield.params["entity"], cfield.params["field"]
+                if entity in context and field in context[entity]:
+                    columns = subset.get(entity) or {}
+                    columns[field] = context[entity][field]
+                    subset[entity] = columns
+        return subset
+
+    def _publish_context(self, context: GenerationContext) -> str:
+        """
+        Контекст шардов сериализуется один раз в файл: воркеры получают только путь
+        и читают файл один раз на процесс, а не вместе с каждым шардом.
+        """
+        path = os.path.join(tempfile.gettempdir(), f"sdg-context-{uuid4().hex}.pickle")
+        with open(path, "wb") as f:
+            pickle.dump(context, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self._context_files.append(path)
+        return path
+
+    def _release_shards(self):
+        """Отменить недополученные шарды и удалить файлы контекстов."""
+        for future in self._inflight:
+            future.cancel()
+        self._inflight.clear()
+        for path in self._context_files:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._context_files.clear()
+
+    def _start_shards(
+            self,
+            entity: CompiledEntity,
+            context: GenerationContext,
+            executor: Optional[Executor]
+            ) -> Iterator[Dict[str, List[Any]]]:
+        """
+        Шарды сущности по порядку. Под-seed шарда выводится из seed запроса,
+        имени сущности и номера шарда, поэтому результат одинаков при любом числе воркеров.
 
-    def execute(self, blueprint: Blueprint) -> Dict[str, List[Dict[str, Any]]]:
-        results: Dict[str, List[Dict[str, Any]]] = {}
-        context: Dict[str, List[Dict[str, Any]]] = {}
+        С пулом первые шарды отправляются в работу сразу при вызове (а не при первом next),
+        так что шарды всех сущностей одного уровня генерируются одновременно.
+        """
+        count = entity.count
+        shards = iter([
+            (min(self.shard_size, count - start), derive_seed(self._base_seed, entity.name, idx))
+            for idx, start in enumerate(range(0, count, self.shard_size))
+        ])
+        tracer = self.tracer
+        if executor is None:
+            def generate(size, seed):
+                start = time.perf_counter()
+                with tracer.span("generate_entity"):
+                    columns = generate_shard(self.faker, entity.fields, size, seed, context, tracer, entity.name)
+                self.entity_seconds[entity.name] += time.perf_counter() - start
+                return columns
 
-        order = topo_sort(blueprint)
+            return (generate(size, seed) for size, seed in shards)
 
-        for entity_name in order:
-            entity_def = blueprint.entities[entity_name]
-            generated = self.generate_entity(
-                entity_name,
-                entity_def.fields,
-                entity_def.count,
-                context
+        shard_context = self._shard_context(entity.fields, context)
+        if shard_context:
+            shard_context = self._publish_context(shard_context)
+
+        def submit(shard):
+            size, seed = shard
+            future = executor.submit(
+                _shard_worker, entity.fields, size, seed, shard_context, self.locale, tracer.enabled, entity.name
             )
-            results[entity_name] = generated
-            context[entity_name] = generated
-
-        self._apply_rules(entity_name, generated, blueprint, context)
-
-        for parent_entity, parent_def in blueprint.entities.items():
-            for fname, fdef in parent_def.fields.items():
-                if fdef.type == FieldType.ONE_TO_MANY:
-                    self._resolve_one_to_many(
-                        context,
-                        parent_entity,
-                        fname,
-                        fdef,
-                        blueprint
-                    )
-
-        return results
+            self._inflight.add(future)
+            return future
+
+        # Ограничиваем число шардов «в полёте», чтобы не держать в памяти всю сущность
+        pending = deque(submit(shard) for shard in islice(shards, self.workers * 2))
+
+        def drain():
+            while pending:
+                future = pending.popleft()
+                result, spans, seconds = future.result()
+                self._inflight.discard(future)
+                tracer.merge(spans)
+                self.entity_seconds[entity.name] += seconds
+                shard = next(shards, None)
+                if shard is not None:
+                    pending.append(submit(shard))
+                yield result
+
+        return drain()
+
+    @staticmethod
+    def _rechunk(
+            shards: Iterator[Dict[str, List[Any]]],
+            chunk_size: Optional[int]
+            ) -> Iterator[Dict[str, List[Any]]]:
+        """Перекладывает шарды в куски ровно по chunk_size записей (None — одним куском)."""
+        pending: Dict[str, List[Any]] = {}
+        for shard in shards:
+            for field, values in shard.items():
+                pending.setdefault(field, []).extend(values)
+            while chunk_size is not None and len(next(iter(pending.values()))) >= chunk_size:
+                yield {field: values[:chunk_size] for field, values in pending.items()}
+                pending = {field: values[chunk_size:] for field, values in pending.items()}
+        if pending and next(iter(pending.values())):
+            yield pending
+
+    def execute_iter(
+            self,
+            blueprint: Union[Blueprint, CompiledBlueprint],
+            chunk_size: Optional[int] = DEFAULT_CHUNK_SIZE
+            ) -> Iterator[Tuple[str, Dict[str, List[Any]]]]:
+        """
+        Генерирует сущности в порядке topo sort кусками по chunk_size записей
+        и отдаёт (имя, колонки куска). chunk_size=None — сущность целиком.
+
+        В памяти удерживается только то, что нужно последующим этапам:
+        колонки, на которые ссылаются reference и rules, и индексы one_to_many.
+        Сущности с полями one_to_many хранятся целиком и отдаются в конце —
+        после генерации всех дочерних записей и разрешения связей.
+
+        При workers > 1 шарды сущностей генерируются в общем пуле процессов
+        (shard_executors), а независимые сущности одного уровня topo_levels — одновременно.
+
+        Blueprint компилируется через кэш compiled_blueprints (с валидацией);
+        можно передать и готовый CompiledBlueprint.
+        """
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError("chunk_size должен быть положительным")
+        compiled = self._compile(blueprint)
+
+        executor = shard_executors.get(self.workers) if self.workers > 1 else None
+        try:
+            yield from self._execute_iter(compiled, chunk_size, executor)
+        except BrokenProcessPool:
+            shard_executors.discard(executor)
+            raise
+        finally:
+            self._release_shards()
+            self.close()
+
+    def _execute_iter(
+            self,
+            compiled: CompiledBlueprint,
+            chunk_size: Optional[int],
+            executor: Optional[Executor]
+            ) -> Iterator[Tuple[str, Dict[str, List[Any]]]]:
+        keep, relations, deferred = compiled.keep, compiled.relations, compiled.deferred
+        embedded = compiled.embedded
+        context = GenerationContext()
+        indexes: Dict[Tuple[str, str], Dict[Any, List[Any]]] = {key: {} for key in relations}
+
+        for level in compiled.levels:
+            # Все сущности уровня запускаются сразу — они зависят только от предыдущих уровней
+            streams = {
+                entity_name: self._start_shards(compiled.entities[entity_name], context, executor)
+                for entity_name in level
+            }
+
+            for entity_name in level:
+                rules = self._bind_entity_rules(compiled.entities[entity_name])
+
+                for chunk in self._rechunk(streams.pop(entity_name), chunk_size):
+                    with self.tracer.span("apply_rules"):
+                        self._apply_rules(chunk, rules, context)
+
+                    if entity_name in deferred:
+                        context.extend(entity_name, chunk)
+                        continue
+
+                    offset = len(next(iter(context[entity_name].values()))) if entity_name in context else 0
+                    if entity_name in embedded:
+                        context.extend(entity_name, chunk)
+                    elif entity_name in keep:
+                        context.extend(entity_name, {f: chunk[f] for f in keep[entity_name] if f in chunk})
+                    for key, fdef in relations.items():
+                        if fdef.params["entity"] == entity_name:
+                            with self.tracer.span("index_one_to_many"):
+                                self._index_children(indexes[key], chunk, fdef, offset)
+                    yield entity_name, chunk
+
+        # Дочерние сущности, которые сами являются родителями, разрешаются раньше
+        # своих родителей, чтобы вложенные embed содержали готовые связи
+        for entity_name in reversed(deferred):
+            for (parent, fname), fdef in relations.items():
+                if parent != entity_name:
+                    continue
+                child = fdef.params["entity"]
+                with self.tracer.span("resolve_one_to_many"):
+                    if child in deferred:
+                        self._index_children(indexes[(parent, fname)], context[child], fdef)
+                    self._resolve_one_to_many(context, parent, fname, fdef, indexes[(parent, fname)])
+
+        for entity_name in deferred:
+            columns = context[entity_name]
+            total = compiled.entities[entity_name].count
+            size = chunk_size or total
+            for offset in range(0, total, size):
+                yield entity_name, {f: values[offset:offset + size] for f, values in columns.items()}
+
+    def iter_entities(self, blueprint: Union[Blueprint, CompiledBlueprint]) -> Iterator[Tuple[str, Dict[str, List[Any]]]]:
+        """
+        Генерирует сущности в порядке topo sort и отдаёт (имя, колонки)
+        сразу, как только сущность готова (правила применены).
+        Сущности с полями one_to_many отдаются в конце — после того,
+        как сгенерированы все дочерние записи и разрешены связи.
+        """
+        return self.execute_iter(blueprint, chunk_size=None)
+
+    def execute(
+            self,
+            blueprint: Union[Blueprint, CompiledBlueprint],
+            columnar: bool = False
+            ) -> Dict[str, Any]:
+        """
+        Генерирует все сущности blueprint.
+        columnar=False — {сущность: [записи...]} из обычных list и dict (как раньше):
+        вложенные embed-записи — независимые копии;
+        columnar=True — {сущность: {поле: [значения...]}}, записи не материализуются,
+        embed-поля содержат EmbeddedRows (сериализуются api.serialization.dumps).
+        """
+        compiled = self._compile(blueprint)
+        generated = dict(self.iter_entities(compiled))
+        order = compiled.order
+
+        if columnar:
+            return {name: generated[name] for name in order}
+        with self.tracer.span("rows"):
+            return {name: columns_to_rows(materialize_embedded(generated[name])) for name in order}
@@ -0,0 +1,86 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from faker import Faker
+
+
+DEFAULT_LOCALE = "en_US"
+# Локали, для которых экземпляры Faker создаются заранее при старте приложения
+SUPPORTED_LOCALES = tuple(
+    locale.strip() for locale in os.getenv("SDG_FAKER_LOCALES", DEFAULT_LOCALE).split(",") if locale.strip()
+)
+# Сколько свободных экземпляров одной локали держать в пуле
+DEFAULT_FAKER_POOL_SIZE = int(os.getenv("SDG_FAKER_POOL_SIZE", "8"))
+
+
+class FakerPool:
+    """
+    Пул заранее созданных экземпляров Faker по локалям.
+    Создание Faker (разрешение провайдеров локали) стоит миллисекунды,
+    поэтому запрос берёт готовый экземпляр, пересидирует его и возвращает в пул.
+    Если свободных нет — создаётся новый; лишние при возврате отбрасываются.
+    """
+
+    def __init__(self, max_idle: int = DEFAULT_FAKER_POOL_SIZE):
+        self.max_idle = max_idle
+        self._idle: Dict[str, List[Faker]] = {}
+        self._lock = threading.Lock()
+        self.created = 0
+
+    def checkout(self, locale: str = DEFAULT_LOCALE, seed: Optional[int] = None) -> Faker:
+        """Взять экземпляр локали; seed — пересидировать его под запрос."""
+        with self._lock:
+            idle = self._idle.get(locale)
+            faker = idle.pop() if idle else None
+        if faker is None:
+            faker = self._create(locale)
+        if seed is not None:
+            faker.seed_instance(seed)
+        return faker
+
+    def release(self, faker: Faker):
+        """Вернуть экземпляр в пул."""
+        locale = faker.locales[0]
+        with self._lock:
+            idle = self._idle.setdefault(locale, [])
+            if len(idle) < self.max_idle:
+                idle.append(faker)
+
+    @contextmanager
+    def acquire(self, locale: str = DEFAULT_LOCALE, seed: Optional[int] = None) -> Iterator[Faker]:
+        faker = self.checkout(locale, seed)
+        try:
+            yield faker
+        finally:
+            self.release(faker)
+
+    def warm(self, locales: Iterable[str] = SUPPORTED_LOCALES, per_locale: int = 1):
+        """Заранее создать экземпляры (вызывается при старте приложения)."""
+        for locale in locales:
+            fakers = [self.checkout(locale) for _ in range(per_locale)]
+            for faker in fakers:
+                self.release(faker)
+
+    def idle(self, locale: str = DEFAULT_LOCALE) -> int:
+        with self._lock:
+            return len(self._idle.get(locale, []))
+
+    def clear(self):
+        with self._lock:
+            self._idle.clear()
+
+    def _create(self, locale: str) -> Faker:
+        faker = Faker(locale)
+        # Первые вызовы провайдеров лениво инициализируют их данные — делаем это сразу
+        faker.seed_instance(0)
+        faker.name()
+        faker.text(max_nb_chars=20)
+        with self._lock:
+            self.created += 1
+        return faker
+
+
+# Глобальный пул процесса
+faker_pool = FakerPool()
@@ -1,16 +1,57 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
 from faker import Faker
 
 
 class FieldValueGenerator(ABC):
-    """Абстрактный базовый класс для всех генераторов полей."""
+    """
+    Абстрактный базовый класс для всех генераторов полей.
+
+    Возможности генератора объявляются атрибутами класса — по ним реестр
+    при регистрации один раз строит фабрику экземпляров:
+    requires_context — конструктор принимает context (GenerationContext);
+    requires_field_name — конструктор принимает field_name;
+    uses_rng — значения берутся из self.rng (фабрика может подставить готовый ГСЧ);
+    supports_batch — generate_batch переопределён и заполняет колонку за один вызов.
+    """
+
+    requires_context: bool = False
+    requires_field_name: bool = False
+    uses_rng: bool = False
+    supports_batch: bool = False
+
+    _rng: Optional[np.random.Generator] = None
 
     def __init__(self, faker: Faker, params: Dict[str, Any]):
         self.faker = faker
         self.params = params
 
+    @property
+    def rng(self) -> np.random.Generator:
+        """
+        Векторный генератор случайных чисел для batch-генерации.
+        Создаётся лениво и сидируется из экземпляра Faker, поэтому
+        при заданном seed результат остаётся детерминированным.
+        """
+        if self._rng is None:
+            self._rng = np.random.default_rng(self.faker.random.getrandbits(64))
+        return self._rng
+
+    @rng.setter
+    def rng(self, value: np.random.Generator):
+        self._rng = value
+
     @abstractmethod
     def generate(self) -> Any:
         """Сгенерировать значение."""
         ...
+
+    def generate_batch(self, count: int) -> List[Any]:
+        """
+        Сгенерировать целую колонку из count значений.
+        По умолчанию вызывает generate() построчно — генераторы,
+        умеющие заполнять колонку за один вызов, переопределяют этот метод.
+        """
+        return [self.generate() for _ in range(count)]
@@ -1,96 +1,161 @@
-from typing import Any, Dict
+from typing import Any, Dict, List
+
+import numpy as np
 from faker import Faker
 
 from .registry import registry
 from .models import FieldType
+from .context import GenerationContext
 from .fields import FieldValueGenerator
+from .pools import POOLED_SUBTYPES, value_pools
+
+# Границы numpy.random.Generator.integers; за их пределами — построчный faker.random_int
+_INT64 = np.iinfo(np.int64)
+
+
+def _faker_locale(faker: Faker) -> str:
+    locales = getattr(faker, "locales", None)
+    return locales[0] if locales else "en_US"
 
 
 @registry.register(FieldType.STRING)
 class StringFieldGenerator(FieldValueGenerator):
+    requires_field_name = True
+    uses_rng = True
+    supports_batch = True
 
     def __init__(self, faker: Faker, params: Dict[str, Any], field_name: str = None):
         super().__init__(faker, params)
         self.field_name = field_name
 
-    def _generate_objects(self):
-        if self.params.get('subtype') == 'name':
-            return self.faker.name()
-        if self.params.get('subtype') == 'first_name':
-            return self.faker.first_name()
-        if self.params.get('subtype') == 'last_name':
-            return self.faker.last_name()
-        if self.params.get('subtype') == 'email':
-            return self.faker.email()
-        if self.params.get('subtype') == 'address':
-            return self.faker.address()
-        if self.params.get('subtype') == 'job':
-            return self.faker.job()
-
     def generate(self) -> str:
-        special_subtype = self._generate_objects()
-        if special_subtype:
-            return special_subtype
+        return self.generate_batch(1)[0]
+
+    def generate_batch(self, count: int) -> List[str]:
+        subtype = self.params.get("subtype")
+        if subtype in POOLED_SUBTYPES:
+            return value_pools.sample(_faker_locale(self.faker), subtype, self.rng, count)
         max_len = self.params.get("max_length", 20)
-        return self.faker.text(max_nb_chars=max_len).strip()
+        return [self.faker.text(max_nb_chars=max_len).strip() for _ in range(count)]
 
 
 @registry.register(FieldType.EMAIL)
 class EmailFieldGenerator(FieldValueGenerator):
+    # Не из пула значений: email часто считают уникальным, а пул дал бы повторы на любом count
     def generate(self) -> str:
         return self.faker.email()
 
 
 @registry.register(FieldType.INTEGER)
 class IntegerFieldGenerator(FieldValueGenerator):
+    uses_rng = True
+    supports_batch = True
+
     def generate(self) -> int:
-        return self.faker.random_int(
-            min=self.params.get("min", 0),
-            max=self.params.get("max", 10000)
-        )
+        return self.generate_batch(1)[0]
+
+    def generate_batch(self, count: int) -> List[int]:
+        low = self.params.get("min", 0)
+        high = self.params.get("max", 10000)
+        if low < _INT64.min or high > _INT64.max:
+            return [self.faker.random_int(min=low, max=high) for _ in range(count)]
+        # Границы включительно — как у faker.random_int
+        return self.rng.integers(low, high, size=count, endpoint=True).tolist()
 
 
 @registry.register(FieldType.UUID)
 class UUIDFieldGenerator(FieldValueGenerator):
+    """
+    uuid v4: вся колонка строится из одного буфера случайных байт —
+    биты версии/варианта выставляются векторно, hex-форматирование за один проход.
+    """
+
+    uses_rng = True
+    supports_batch = True
+
+    # Позиции hex-символов в строке uuid (остальные — дефисы 8-4-4-4-12)
+    _HEX_POSITIONS = np.array([i for i in range(36) if i not in (8, 13, 18, 23)])
+
     def generate(self) -> str:
-        return self.faker.uuid4()
+        return self.generate_batch(1)[0]
+
+    def generate_batch(self, count: int) -> List[str]:
+        if count <= 0:
+            return []
+        raw = np.frombuffer(self.rng.bytes(16 * count), dtype=np.uint8).reshape(count, 16).copy()
+        raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # версия 4
+        raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # вариант RFC 4122
+
+        hexed = np.frombuffer(raw.tobytes().hex().encode("ascii"), dtype="S1").reshape(count, 32)
+        formatted = np.full((count, 36), b"-", dtype="S1")
+        formatted[:, self._HEX_POSITIONS] = hexed
+        return formatted.view("S36").ravel().astype(str).tolist()
 
 
 @registry.register(FieldType.FLOAT)
 class FloatFieldGenerator(FieldValueGenerator):
+    uses_rng = True
+    supports_batch = True
+
     def generate(self) -> float:
-        return self.faker.pyfloat(
-            min_value=self.params.get("min", 0.0),
-            max_value=self.params.get("max", 1.0),
-            right_digits=self.params.get("precision", 2)
-        )
+        return self.generate_batch(1)[0]
+
+    def generate_batch(self, count: int) -> List[float]:
+        low = self.params.get("min", 0.0)
+        high = self.params.get("max", 1.0)
+        precision = self.params.get("precision", 2)
+        # Сначала clip, затем округление: у значений не больше precision знаков,
+        # как у faker.pyfloat(right_digits=precision)
+        values = np.clip(self.rng.uniform(low, high, size=count), low, high)
+        return np.round(values, precision).tolist()
 
 
 @registry.register(FieldType.BOOLEAN)
 class BooleanFieldGenerator(FieldValueGenerator):
+    uses_rng = True
+    supports_batch = True
+
     def generate(self) -> bool:
-        return self.faker.boolean()
+        return self.generate_batch(1)[0]
+
+    def generate_batch(self, count: int) -> List[bool]:
+        return (self.rng.random(size=count) < 0.5).tolist()
 
 
 @registry.register("reference")
 class ReferenceFieldGenerator(FieldValueGenerator):
-    """Генератор для ссылочных полей."""
-
-    def __init__(self, faker: Faker, params: Dict[str, Any], context: Dict[str, Any]):
+    """
+    Генератор для ссылочных полей.
+    context — GenerationContext с колонками уже сгенерированных сущностей.
+    Колонка заполняется выборкой вектора случайных индексов в компактный
+    массив ссылочного поля, который строится один раз на сущность.
+    """
+
+    requires_context = True
+    uses_rng = True
+    supports_batch = True
+
+    def __init__(self, faker: Faker, params: Dict[str, Any], context: GenerationContext):
         super().__init__(faker, params)
         self.context = context
 
     def generate(self) -> Any:
+        return self.generate_batch(1)[0]
+
+    def generate_batch(self, count: int) -> List[Any]:
         entity = self.params["entity"]
         field = self.params["field"]
 
         if entity not in self.context:
             raise ValueError(f"Сущность '{entity}' не найдена в контексте")
-        if not self.context[entity]:
+        if field not in self.context[entity]:
+            raise ValueError(f"Поле '{field}' не найдено в сущности '{entity}'")
+
+        column = self.context.column_array(entity, field)
+        if not len(column):
             raise ValueError(f"Нет доступных записей для сущности '{entity}'")
 
-        ref_obj = self.faker.random_element(self.context[entity])
-        return ref_obj[field]
+        return column[self.rng.integers(0, len(column), size=count)].tolist()
 
 
 @registry.register(FieldType.ONE_TO_MANY)
@@ -1,8 +1,15 @@
+import os
 from typing import Dict, Any, Optional, List
 from enum import Enum
 from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict
 
 
+# Верхняя граница count для сущности; переопределяется переменной окружения
+MAX_ENTITY_COUNT = int(os.getenv("SDG_MAX_ENTITY_COUNT", "1000000"))
+# Сколько первых записей сущности можно запросить в preview (response_mode=summary)
+MAX_PREVIEW_ROWS = 100
+
+
 class FieldType(str, Enum):
     STRING = "string"
     INTEGER = "integer"
@@ -14,6 +21,13 @@ class FieldType(str, Enum):
     ONE_TO_MANY = "one_to_many"
 
 
+class ResponseMode(str, Enum):
+    """Что возвращает POST /api/generate помимо файла в generated/"""
+    INLINE = "inline"    # весь датасет в поле data
+    FILE = "file"        # только ссылка на файл и число записей
+    SUMMARY = "summary"  # число записей, размер файла и первые preview_rows записей сущностей
+
+
 class FieldDefinition(BaseModel):
     """Описание одного поля сущности"""
     type: FieldType
@@ -114,7 +128,7 @@ class Rule(BaseModel):
 
 class EntityDefinition(BaseModel):
     """Описание одной сущности"""
-    count: int = Field(gt=0, le=5000, description="Количество записей")
+    count: int = Field(gt=0, le=MAX_ENTITY_COUNT, description="Количество записей")
     fields: Dict[str, FieldDefinition]
     rules: List[Rule] = Field(default_factory=list)
 
@@ -168,6 +182,9 @@ class GenerationRequest(BaseModel):
     """Запрос на генерацию данных по чертежу"""
     blueprint: Blueprint
     seed: Optional[int] = None
+    response_mode: ResponseMode = ResponseMode.INLINE
+    preview_rows: int = Field(5, ge=0, le=MAX_PREVIEW_ROWS, description="Записей на сущность в preview")
+    timings: bool = Field(False, description="Вернуть время фаз генерации в блоке timings")
 
     model_config = ConfigDict(extra="forbid")
 
@@ -0,0 +1,91 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Tuple
+
+import numpy as np
+from faker import Faker
+
+
+# Подтипы строк, значения которых берутся из предвычисленных пулов
+POOLED_SUBTYPES = ("name", "first_name", "last_name", "email", "address", "job")
+
+DEFAULT_POOL_SIZE = int(os.getenv("SDG_VALUE_POOL_SIZE", "2048"))
+DEFAULT_MAX_POOLS = int(os.getenv("SDG_VALUE_POOL_MAX_POOLS", "32"))
+# Строить ли пулы при старте процесса (API и воркеров шардов), иначе — при первом обращении
+WARM_VALUE_POOLS = os.getenv("SDG_WARM_VALUE_POOLS", "1") == "1"
+
+# Пул строится независимо от seed запроса — детерминированность
+# обеспечивается выборкой индексов seeded-генератором.
+POOL_SEED = 0
+POOL_MAX_MISSES = 256
+
+
+class ValuePoolRegistry:
+    """
+    Общие для всех запросов пулы уникальных значений Faker по (locale, subtype).
+    Пул строится лениво при первом обращении, число пулов ограничено (LRU).
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, max_pools: int = DEFAULT_MAX_POOLS):
+        self.pool_size = pool_size
+        self.max_pools = max_pools
+        self._pools: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, locale: str, subtype: str) -> np.ndarray:
+        """Вернуть пул значений, построив его при необходимости."""
+        if subtype not in POOLED_SUBTYPES:
+            raise ValueError(f"Для подтипа '{subtype}' пул значений не поддерживается")
+
+        key = (locale, subtype)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._build(locale, subtype)
+                self._pools[key] = pool
+                while len(self._pools) > self.max_pools:
+                    self._pools.popitem(last=False)
+            else:
+                self._pools.move_to_end(key)
+            return pool
+
+    def sample(self, locale: str, subtype: str, rng: np.random.Generator, count: int) -> List[str]:
+        """Колонка из count значений: случайные индексы в пул."""
+        pool = self.get(locale, subtype)
+        return pool[rng.integers(0, len(pool), size=count)].tolist()
+
+    def warm(self, locales: Iterable[str]):
+        """Построить пулы всех подтипов для локалей заранее."""
+        for locale in locales:
+            for subtype in POOLED_SUBTYPES:
+                self.get(locale, subtype)
+
+    def clear(self):
+        with self._lock:
+            self._pools.clear()
+
+    def _build(self, locale: str, subtype: str) -> np.ndarray:
+        faker = Faker(locale)
+        faker.seed_instance(POOL_SEED)
+        provider = getattr(faker, subtype)
+
+        # У части подтипов (job, first_name) уникальных значений меньше, чем pool_size:
+        # прекращаем построение, если новые значения долго не появляются
+        values = {}
+        misses = 0
+        while len(values) < self.pool_size and misses < POOL_MAX_MISSES:
+            value = provider()
+            if value in values:
+                misses += 1
+                continue
+            values[value] = None
+            misses = 0
+
+        pool = np.empty(len(values), dtype=object)
+        pool[:] = list(values)
+        return pool
+
+
+# Глобальный реестр пулов
+value_pools = ValuePoolRegistry()
@@ -1,20 +1,88 @@
-from typing import Dict, Type, Union, Any, Optional
+import inspect
+from typing import Callable, Dict, Type, Union, Any, Optional
+
+import numpy as np
 from faker import Faker
 
 from .fields import FieldValueGenerator
 from .models import FieldType
 
 
+class GeneratorSpec:
+    """
+    Описание зарегистрированного генератора: класс, его возможности
+    и готовая фабрика экземпляров. Строится один раз при регистрации.
+    """
+
+    __slots__ = ("generator_cls", "requires_context", "requires_field_name", "uses_rng", "supports_batch", "factory")
+
+    def __init__(self, generator_cls: Type[FieldValueGenerator]):
+        parameters = inspect.signature(generator_cls.__init__).parameters
+        # Генераторы без объявленных возможностей (написанные до их появления)
+        # распознаются по именам параметров конструктора
+        self.generator_cls = generator_cls
+        self.requires_context = bool(getattr(generator_cls, "requires_context", False)) or "context" in parameters
+        self.requires_field_name = (
+            bool(getattr(generator_cls, "requires_field_name", False)) or "field_name" in parameters
+        )
+        self.uses_rng = bool(getattr(generator_cls, "uses_rng", False))
+        self.supports_batch = bool(getattr(generator_cls, "supports_batch", False))
+
+        for name, flag in (("context", self.requires_context), ("field_name", self.requires_field_name)):
+            if flag and name not in parameters:
+                raise TypeError(
+                    f"Generator {generator_cls.__name__} requires '{name}', "
+                    f"but its __init__ has no '{name}' parameter"
+                )
+        extra = [
+            p.name for p in list(parameters.values())[3:]
+            if p.name not in ("context", "field_name")
+            and p.default is inspect.Parameter.empty
+            and p.kind not in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD)
+        ]
+        if extra:
+            raise TypeError(f"Cannot instantiate generator {generator_cls.__name__}: unknown parameters {extra}")
+
+        self.factory = self._build_factory()
+
+    def _build_factory(self) -> Callable[..., FieldValueGenerator]:
+        generator_cls = self.generator_cls
+        pass_context, pass_field_name = self.requires_context, self.requires_field_name
+        uses_rng = self.uses_rng
+
+        def factory(
+            faker: Faker,
+            params: Dict[str, Any],
+            context: Optional[Dict[str, Any]] = None,
+            field_name: Optional[str] = None,
+            rng: Optional[np.random.Generator] = None
+        ) -> FieldValueGenerator:
+            kwargs = {}
+            if pass_context:
+                kwargs["context"] = context
+            if pass_field_name:
+                kwargs["field_name"] = field_name
+            generator = generator_cls(faker, params, **kwargs)
+            if rng is not None and uses_rng:
+                generator.rng = rng
+            return generator
+
+        return factory
+
+
 class GeneratorRegistry:
     """Реестр генераторов (паттерн Registry), с поддержкой Enum FieldType."""
 
     def __init__(self):
         self._generators: Dict[FieldType, Type[FieldValueGenerator]] = {}
+        self._specs: Dict[Type[FieldValueGenerator], GeneratorSpec] = {}
 
     def register(self, name: Union[str, FieldType]):
         """Декоратор для регистрации генератора."""
         def decorator(generator_cls: Type[FieldValueGenerator]):
             key = self._normalize_key(name)
+            # Конструктор разбирается здесь, а не при каждом создании экземпляра
+            self._specs[generator_cls] = GeneratorSpec(generator_cls)
             self._generators[key] = generator_cls
             return generator_cls
         return decorator
@@ -26,6 +94,14 @@ class GeneratorRegistry:
             raise ValueError(f"Generator '{name}' not registered")
         return self._generators[key]
 
+    def get_spec(self, generator: Union[str, FieldType, Type[FieldValueGenerator]]) -> GeneratorSpec:
+        """Возможности и фабрика генератора (по ключу или по классу)."""
+        generator_cls = generator if inspect.isclass(generator) else self.get_generator(generator)
+        spec = self._specs.get(generator_cls)
+        if spec is None:
+            spec = self._specs[generator_cls] = GeneratorSpec(generator_cls)
+        return spec
+
     def create_instance(
         self,
         name: str,
@@ -35,21 +111,19 @@ class GeneratorRegistry:
         field_name: Optional[str] = None
     ) -> FieldValueGenerator:
         generator_cls = self.get_generator(name)
+        return self.create_from_class(generator_cls, faker, params, context=context, field_name=field_name)
 
-        try:
-            return generator_cls(faker, params, context)
-        except TypeError:
-            pass
-
-        try:
-            return generator_cls(faker, params, field_name)
-        except TypeError:
-            pass
-
-        try:
-            return generator_cls(faker, params)
-        except TypeError as e:
-            raise TypeError(f"Cannot instantiate generator {generator_cls}: {e}")
+    def create_from_class(
+        self,
+        generator_cls: Type[FieldValueGenerator],
+        faker: Faker,
+        params: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None,
+        field_name: Optional[str] = None,
+        rng: Optional[np.random.Generator] = None
+    ) -> FieldValueGenerator:
+        """Создать генератор по уже найденному классу (например, из CompiledBlueprint)."""
+        return self.get_spec(generator_cls).factory(faker, params, context=context, field_name=field_name, rng=rng)
 
     @staticmethod
     def _normalize_key(name: Union[str, FieldType]) -> FieldType:
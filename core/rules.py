@@ -0,0 +1,171 @@
+import operator
+import random
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from .context import GenerationContext
+from .models import Action, Condition, Rule
+
+
+def _contains(left: Any, right: Any) -> bool:
+    return left in right
+
+
+_INT64 = np.iinfo(np.int64)
+
+
+def _integers(rng: np.random.Generator, low: int, high: int, count: int) -> List[int]:
+    """
+    count целых из [low, high] включительно. Границы вне int64 numpy не принимает —
+    для них python-ГСЧ (произвольная точность), сидируемый из rng.
+    """
+    if low < _INT64.min or high > _INT64.max:
+        fallback = random.Random(int(rng.integers(_INT64.max)))
+        return [fallback.randint(low, high) for _ in range(count)]
+    return rng.integers(low, high, size=count, endpoint=True).tolist()
+
+
+_SCALARS = (str, bytes, int, float, bool, np.generic)
+
+
+# Операторы условий; для них же построчный fallback при несравнимых значениях
+_OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    "eq": operator.eq,
+    "neq": operator.ne,
+    "gt": operator.gt,
+    "lt": operator.lt,
+    "in": _contains,
+}
+
+
+class CompiledRule:
+    """
+    Правило rules, скомпилированное для применения над целыми колонками.
+    Атрибуты Condition/Action читаются один раз, условие вычисляется
+    как булева маска через индекс первичного ключа ссылочной сущности,
+    действие применяется пакетно к отмеченным записям.
+    """
+
+    def __init__(self, rule: Rule):
+        self._bind(rule.if_, rule.then)
+
+    @classmethod
+    def from_parts(cls, condition: Optional[Condition] = None, action: Optional[Action] = None) -> "CompiledRule":
+        """
+        Правило из отдельных условия и действия (построчные обёртки core.utils):
+        без условия mask() не отмечает записи, без действия act() ничего не меняет.
+        """
+        compiled = cls.__new__(cls)
+        compiled._bind(condition, action)
+        return compiled
+
+    def _bind(self, cond: Optional[Condition], action: Optional[Action]):
+        self.entity = cond.entity if cond else None
+        self.local_field = cond.local_field if cond else None
+        self.target_field = cond.field if cond else None
+        self.op = cond.op if cond else None
+        self.value = cond.value if cond else None
+        self.compare = _OPERATORS.get(self.op)
+        # Над массивом сравниваются только скаляры: список или кортеж numpy
+        # развернул бы поэлементно, а условие сравнивает запись со значением целиком
+        self.vectorized = self.op != "in" and isinstance(self.value, _SCALARS)
+
+        self.action = action.action if action else None
+        self.field = action.field if action else None
+        self.min = action.min if action else None
+        self.max = action.max if action else None
+
+    def mask(self, columns: Dict[str, List[Any]], context: GenerationContext) -> np.ndarray:
+        """Маска записей сущности, для которых выполняется условие."""
+        count = len(next(iter(columns.values())))
+        mask = np.zeros(count, dtype=bool)
+        if self.compare is None or self.entity not in context or self.local_field not in columns:
+            return mask
+
+        index = context.key_index(self.entity)
+        positions = np.fromiter(
+            (index.get(fk, -1) for fk in columns[self.local_field]),
+            dtype=np.intp,
+            count=count,
+        )
+        found = positions >= 0
+        if not found.any():
+            return mask
+
+        if self.target_field in context[self.entity]:
+            left = context.column_array(self.entity, self.target_field)[positions[found]]
+        else:
+            left = np.full(int(found.sum()), None, dtype=object)
+        mask[found] = self._evaluate(left)
+        return mask
+
+    def _evaluate(self, left: np.ndarray) -> np.ndarray:
+        if self.vectorized:
+            try:
+                result = np.asarray(self.compare(left, self.value), dtype=bool)
+                if result.shape == left.shape:
+                    return result
+            except (TypeError, ValueError):
+                pass
+        # Несравнимые значения (None, разные типы) не проходят условие
+        return np.fromiter((self._safe_compare(v) for v in left), dtype=bool, count=len(left))
+
+    def _safe_compare(self, left: Any) -> bool:
+        try:
+            return bool(self.compare(left, self.value))
+        except Exception:
+            return False
+
+    def apply(
+        self,
+        columns: Dict[str, List[Any]],
+        context: GenerationContext,
+        rng: np.random.Generator
+    ):
+        """
+        Вычислить условие и применить действие к колонкам сущности (на месте).
+        columns могут быть как сущностью целиком, так и куском при execute_iter.
+        """
+        self.act(columns, self.mask(columns, context), rng)
+
+    def act(self, columns: Dict[str, List[Any]], mask: np.ndarray, rng: np.random.Generator):
+        """Применить действие к записям, отмеченным в mask (на месте)."""
+        if self.action not in ("set", "adjust"):
+            return
+        column = columns[self.field]
+        if self.action == "adjust":
+            if self.min is None:
+                return
+            mask &= self._below_min(column)
+        if not mask.any():
+            return
+
+        if self.action == "set":
+            low = self.min if self.min is not None else 0
+            high = self.max if self.max is not None else 10000
+        else:
+            low = self.min
+            high = self.max if self.max is not None else self.min * 2
+
+        values = np.empty(len(column), dtype=object)
+        values[:] = column
+        values[mask] = _integers(rng, low, high, int(mask.sum()))
+        columns[self.field] = values.tolist()
+
+    def _below_min(self, column: List[Any]) -> np.ndarray:
+        current = np.empty(len(column), dtype=object)
+        current[:] = column
+        try:
+            return np.asarray(current < self.min, dtype=bool)
+        except TypeError:
+            return np.fromiter(
+                (isinstance(v, (int, float)) and v < self.min for v in column),
+                dtype=bool,
+                count=len(column),
+            )
+
+
+def compile_rules(rules: List[Rule]) -> List[CompiledRule]:
+    """Скомпилировать правила сущности в порядке их объявления."""
+    return [CompiledRule(rule) for rule in rules]
@@ -0,0 +1,77 @@
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, List, Optional
+
+
+# Трассировка всех запросов (в лог), даже если timings не запрошены в ответе
+TRACE_ALL = os.getenv("SDG_TRACE", "0") == "1"
+
+
+class Tracer:
+    """
+    Накопительные интервалы фаз генерации: имя -> суммарное время и число вызовов.
+    Один трассировщик на запрос. Интервалы шардов из пула процессов
+    складываются с остальными (merge), поэтому время суммарное, а не «по часам».
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self._spans: Dict[str, List[float]] = {}
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float, calls: int = 1):
+        span = self._spans.get(name)
+        if span is None:
+            self._spans[name] = [seconds, calls]
+        else:
+            span[0] += seconds
+            span[1] += calls
+
+    def merge(self, spans: Optional[Dict[str, List[float]]]):
+        """Добавить интервалы, снятые в другом процессе (см. export)."""
+        for name, (seconds, calls) in (spans or {}).items():
+            self.add(name, seconds, int(calls))
+
+    def export(self) -> Dict[str, List[float]]:
+        return {name: list(span) for name, span in self._spans.items()}
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """{имя: {"ms": суммарное время, "calls": число вызовов}} в порядке первого появления."""
+        return {
+            name: {"ms": round(seconds * 1000, 3), "calls": int(calls)}
+            for name, (seconds, calls) in self._spans.items()
+        }
+
+
+class NullTracer:
+    """Выключенная трассировка: span возвращает один и тот же пустой контекст."""
+
+    enabled = False
+    _null_span = nullcontext()
+
+    def span(self, name: str):
+        return self._null_span
+
+    def add(self, name: str, seconds: float, calls: int = 1):
+        pass
+
+    def merge(self, spans: Optional[Dict[str, List[float]]]):
+        pass
+
+    def export(self) -> Dict[str, List[float]]:
+        return {}
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {}
+
+
+NULL_TRACER = NullTracer()
@@ -1,70 +1,144 @@
+import hashlib
+import json
+from collections.abc import Sequence
+from typing import Any, Dict, Iterator, List
+import numpy as np
 from faker import Faker
 
+from .context import GenerationContext
+from .models import Action, Condition
+from .rules import CompiledRule
 
-def match_condition(entity_data: dict, context: dict, cond: dict) -> bool:
+
+def iter_rows(columns: Dict[str, List[Any]]) -> Iterator[Dict[str, Any]]:
     """
-    Проверяет условие cond для текущей записи.
-    cond: Condition (pydantic)
+    Лениво собирает записи из колоночного представления сущности.
+    columns: {имя_поля: [значения...]} — все колонки одной длины.
     """
-    ent = getattr(cond, "entity", None) or cond.get("entity")
-    local_field = getattr(cond, "local_field", None) or cond.get("local_field")
-    target_field = getattr(cond, "field", None) or cond.get("field")
-    op = getattr(cond, "op", None) or cond.get("op")
-    val = getattr(cond, "value", None) or cond.get("value")
+    names = list(columns.keys())
+    for values in zip(*columns.values()):
+        yield dict(zip(names, values))
 
-    if ent not in context:
-        return False
 
-    fk = entity_data.get(local_field)
-    if fk is None:
-        return False
+def columns_to_rows(columns: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Материализует колонки сущности в список записей (dict на строку)."""
+    return list(iter_rows(columns))
 
-    ref_obj = next((o for o in context[ent] if o.get("id") == fk), None)
-    if not ref_obj:
-        return False
 
-    left = ref_obj.get(target_field)
-
-    if op == "eq":
-        return left == val
-    if op == "neq":
-        return left != val
-    if op == "gt":
-        try:
-            return left > val
-        except TypeError:
-            return False
-    if op == "lt":
-        try:
-            return left < val
-        except TypeError:
-            return False
-    if op == "in":
-        try:
-            return left in val
-        except Exception:
-            return False
-    return False
+class EmbeddedRows(Sequence):
+    """
+    Вложенные записи one_to_many (embed=True) по ссылке: колонки дочерней сущности
+    и номера её записей. Дочерние записи хранятся один раз, dict на запись собирается
+    только при обращении — при сериализации (api.serialization.dumps), поэтому память
+    растёт линейно с числом записей, а не с глубиной вложенности.
+    Только для чтения: изменения собранной записи в колонки не попадают.
+    """
+
+    __slots__ = ("columns", "positions")
+
+    def __init__(self, columns: Dict[str, List[Any]], positions: List[int]):
+        self.columns = columns
+        self.positions = positions
+
+    def _row(self, pos: int) -> Dict[str, Any]:
+        return {field: values[pos] for field, values in self.columns.items()}
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self._row(pos) for pos in self.positions[item]]
+        return self._row(self.positions[item])
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (self._row(pos) for pos in self.positions)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (EmbeddedRows, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self.to_list())
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return list(self)
+
+    def materialize(self) -> List[Dict[str, Any]]:
+        """Независимые копии записей, вложенные EmbeddedRows тоже раскрыты в списки."""
+        return [
+            {field: value.materialize() if isinstance(value, EmbeddedRows) else value for field, value in row.items()}
+            for row in self
+        ]
+
+
+def materialize_embedded(columns: Dict[str, List[Any]]) -> Dict[str, List[Any]]:
+    """Колонки сущности, в которых EmbeddedRows заменены независимыми списками записей."""
+    result = dict(columns)
+    for field, values in columns.items():
+        if values and isinstance(values[0], EmbeddedRows):
+            result[field] = [value.materialize() for value in values]
+    return result
+
+
+def derive_seed(seed: int, *keys: Any) -> int:
+    """
+    Детерминированный 64-битный под-seed из seed и ключей (сущность, номер шарда...).
+    Не зависит от PYTHONHASHSEED, поэтому одинаков во всех процессах.
+    """
+    digest = hashlib.blake2b(repr((seed,) + keys).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def blueprint_hash(blueprint) -> str:
+    """
+    Канонический хэш blueprint по нормализованному to_dict() (значения по умолчанию заполнены).
+    Ключи не сортируются: порядок полей влияет на результат генерации.
+    """
+    canonical = json.dumps(blueprint.to_dict(), separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _model(model, data):
+    return data if isinstance(data, model) else model.model_validate(data)
+
+
+def _as_context(context) -> GenerationContext:
+    if isinstance(context, GenerationContext):
+        return context
+    # {сущность: [записи...]} — колонки по объединению полей записей
+    entities = {}
+    for name, rows in context.items():
+        fields = list(dict.fromkeys(field for row in rows for field in row))
+        entities[name] = {field: [row.get(field) for row in rows] for field in fields}
+    return GenerationContext(**entities)
+
+
+def match_condition(entity_data: dict, context: dict, cond: dict) -> bool:
+    """
+    Проверяет условие cond для одной записи — построчная обёртка над CompiledRule.mask.
+    cond: Condition (pydantic) или dict
+    context: GenerationContext или {сущность: [записи...]}
+    """
+    if not entity_data:
+        return False
+    rule = CompiledRule.from_parts(condition=_model(Condition, cond))
+    columns = {field: [value] for field, value in entity_data.items()}
+    return bool(rule.mask(columns, _as_context(context))[0])
 
 
 def apply_action(entity_data: dict, faker: Faker, action: dict):
     """
-    Применяет действие action к entity_data.
+    Применяет действие action к entity_data — построчная обёртка над CompiledRule.act.
+    Отсутствующее поле для adjust считается равным 0.
     """
-    field_name = getattr(action, "field", None) or action.get("field")
-    act = getattr(action, "action", None) or action.get("action")
-
-    if act == "set":
-        entity_data[field_name] = faker.random_int(
-            min=getattr(action, "min", None) or action.get("min", 0),
-            max=getattr(action, "max", None) or action.get("max", 10000)
-        )
-    elif act == "adjust":
-        cur = entity_data.get(field_name, 0)
-        min_v = getattr(action, "min", None) or action.get("min")
-        max_v = getattr(action, "max", None) or action.get("max")
-        if min_v is not None and cur < min_v:
-            entity_data[field_name] = faker.random_int(
-                min=min_v,
-                max=max_v or (min_v * 2)
-            )
+    rule = CompiledRule.from_parts(action=_model(Action, action))
+    column = [entity_data.get(rule.field, 0)]
+    columns = {rule.field: column}
+    rule.act(columns, np.ones(1, dtype=bool), np.random.default_rng(faker.random.getrandbits(64)))
+    # act() заменяет колонку, только если действие сработало
+    if columns[rule.field] is not column:
+        entity_data[rule.field] = columns[rule.field][0]
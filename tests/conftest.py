@@ -1,4 +1,16 @@
 import sys
 import os
+import shutil
+import tempfile
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Артефакты и очередь задач тестов пишутся во временный каталог, а не в рабочую копию.
+# Переменные окружения задаются до импорта api и наследуются процессами-воркерами задач.
+_TMP_DIR = tempfile.mkdtemp(prefix="sdg-tests-")
+os.environ.setdefault("SDG_GENERATED_DIR", os.path.join(_TMP_DIR, "generated"))
+os.environ.setdefault("SDG_JOBS_DB", os.path.join(_TMP_DIR, "jobs", "jobs.sqlite3"))
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_TMP_DIR, ignore_errors=True)
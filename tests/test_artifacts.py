@@ -0,0 +1,89 @@
+import os
+import time
+
+from api.artifacts import ArtifactStore, ArtifactSweeper, gzip_path, write_artifact
+
+
+def make_store(tmp_path, **kwargs):
+    return ArtifactStore(directory=str(tmp_path), path=str(tmp_path / ".index.sqlite3"), **kwargs)
+
+
+def add(store, name, payload=b'{"users":[]}', blueprint_hash=None):
+    etag, size = write_artifact(os.path.join(store.directory, name), payload)
+    store.register(name, etag, size, blueprint_hash=blueprint_hash)
+    return size
+
+
+def test_register_records_metadata(tmp_path):
+    store = make_store(tmp_path)
+    size = add(store, "a.json", blueprint_hash="abc")
+    artifact = store.get("a.json")
+    assert artifact["size"] == size == os.path.getsize(tmp_path / "a.json") + os.path.getsize(tmp_path / "a.json.gz")
+    assert artifact["blueprint_hash"] == "abc"
+    assert artifact["created_at"] == artifact["last_access"]
+    assert store.total_bytes() == size
+
+
+def test_sweep_removes_expired_artifacts(tmp_path):
+    store = make_store(tmp_path, ttl=60)
+    add(store, "old.json")
+    add(store, "new.json")
+    now = time.time()
+    with store._connect() as conn:
+        conn.execute("UPDATE artifacts SET last_access = ? WHERE filename = 'old.json'", (now - 120,))
+    assert store.sweep(now=now) == ["old.json"]
+    assert not os.path.exists(tmp_path / "old.json")
+    assert not os.path.exists(gzip_path(str(tmp_path / "old.json")))
+    assert store.get("old.json") is None and store.get("new.json")
+
+    # Скачивание продлевает жизнь артефакта
+    store.touch("new.json")
+    assert store.sweep(now=store.get("new.json")["last_access"] + 59) == []
+
+
+def test_sweep_evicts_least_recently_downloaded_over_quota(tmp_path):
+    store = make_store(tmp_path, ttl=0)
+    size = add(store, "a.json")
+    add(store, "b.json")
+    add(store, "c.json")
+    store.touch("a.json")
+    store.max_bytes = size * 2
+    assert store.sweep() == ["b.json"]
+    assert store.get("a.json") and store.get("c.json")
+
+    # Самый свежий артефакт остаётся, даже если он один больше квоты
+    store.max_bytes = 1
+    assert store.sweep() == ["c.json"]
+    assert store.total_bytes() == size
+
+
+def test_reconcile_adopts_untracked_and_drops_missing(tmp_path):
+    store = make_store(tmp_path)
+    add(store, "gone.json")
+    os.remove(tmp_path / "gone.json")
+    (tmp_path / "legacy.json").write_text("{}")
+    assert store.reconcile() == 2
+    assert store.get("gone.json") is None
+    assert store.get("legacy.json")["size"] == 2
+
+
+def test_touch_adopts_only_json_artifacts(tmp_path):
+    store = make_store(tmp_path)
+    (tmp_path / "legacy.json").write_text("{}")
+    assert store.touch("legacy.json")["etag"]
+    assert store.touch(".index.sqlite3") is None
+    assert store.touch("missing.json") is None
+
+
+def test_sweeper_runs_in_background(tmp_path):
+    store = make_store(tmp_path, ttl=0.01)
+    add(store, "a.json")
+    sweeper = ArtifactSweeper(store, interval=0.01)
+    sweeper.start()
+    try:
+        deadline = time.time() + 5
+        while store.get("a.json") is not None and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        sweeper.stop()
+    assert store.get("a.json") is None
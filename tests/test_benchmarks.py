@@ -0,0 +1,26 @@
+from benchmarks.bench_engine import build_matrix, compare, make_blueprint, run
+from core.compiler import CompiledBlueprint
+
+
+def test_matrix_blueprints_are_valid():
+    cases = build_matrix(scale=0.001)
+    assert len({case["rows"] for case in cases}) == 3
+    for params in cases:
+        CompiledBlueprint(make_blueprint(**params))
+
+
+def test_run_reports_rates_memory_and_phases():
+    results = run([{"rows": 20, "fields": 1, "fanout": 2, "embed": True, "rules": 2}], repeat=1, log=lambda _: None)
+    case = results["cases"][0]
+    assert case["rows"] == 60
+    assert case["rows_per_sec"] > 0 and case["peak_mb"] > 0
+    assert set(case["phases"]) == {"compile", "generate", "rows", "serialize"}
+
+
+def test_compare_flags_regressions():
+    baseline = {"cases": [{"name": "a", "rows_per_sec": 1000, "peak_mb": 10}]}
+    slower = {"cases": [{"name": "a", "rows_per_sec": 700, "peak_mb": 10}, {"name": "new", "rows_per_sec": 1}]}
+    fatter = {"cases": [{"name": "a", "rows_per_sec": 1000, "peak_mb": 13}]}
+    assert compare(slower, baseline, threshold=0.2) == ["a: rows/sec 1000 -> 700"]
+    assert compare(fatter, baseline, threshold=0.2) == ["a: peak 10.0 MB -> 13.0 MB"]
+    assert compare(fatter, baseline, threshold=0.5) == []
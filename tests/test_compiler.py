@@ -0,0 +1,63 @@
+import pytest
+
+from core.compiler import BlueprintCache, CompiledBlueprint, compile_blueprint
+from core.engine import DataGenerationEngine
+from core.generators import IntegerFieldGenerator
+from core.models import Blueprint
+
+
+def make_blueprint(count=5):
+    return Blueprint.from_dict({"entities": {
+        "users": {"count": count, "fields": {
+            "id": {"type": "integer"},
+            "posts": {"type": "one_to_many", "params": {"entity": "posts", "foreign_field": "user_id"}},
+        }},
+        "posts": {"count": 8, "fields": {
+            "id": {"type": "integer"},
+            "user_id": {"type": "reference", "params": {"entity": "users", "field": "id"}},
+        }},
+    }})
+
+
+def test_compiled_blueprint_holds_graph_and_generators():
+    compiled = CompiledBlueprint(make_blueprint())
+    assert compiled.levels == [["users"], ["posts"]]
+    assert compiled.deferred == ["users"]
+    assert ("users", "posts") in compiled.relations
+    assert compiled.entities["users"].fields["id"].generator_cls is IntegerFieldGenerator
+
+
+def test_cache_reuses_compiled_blueprint_for_equal_blueprints():
+    cache = BlueprintCache()
+    first = cache.get(make_blueprint())
+    assert cache.get(make_blueprint()) is first
+    assert cache.get(make_blueprint(count=6)) is not first
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_cache_evicts_least_recently_used():
+    cache = BlueprintCache(max_entries=2)
+    a = cache.get(make_blueprint(1))
+    cache.get(make_blueprint(2))
+    cache.get(make_blueprint(1))
+    cache.get(make_blueprint(3))
+    assert len(cache) == 2
+    assert cache.get(make_blueprint(1)) is a
+    assert cache.misses == 3
+
+
+def test_invalid_blueprint_is_not_cached():
+    cache = BlueprintCache()
+    bp = Blueprint.from_dict({"entities": {"orders": {"count": 1, "fields": {
+        "user_id": {"type": "reference", "params": {"entity": "users", "field": "id"}},
+    }}}})
+    with pytest.raises(ValueError, match="несуществующую сущность"):
+        cache.get(bp)
+    assert len(cache) == 0
+
+
+def test_compiled_blueprint_shared_between_seeds():
+    compiled = compile_blueprint(make_blueprint())
+    assert compile_blueprint(compiled) is compiled
+    assert DataGenerationEngine(seed=1).execute(compiled) == DataGenerationEngine(seed=1).execute(make_blueprint())
+    assert DataGenerationEngine(seed=1).execute(compiled) != DataGenerationEngine(seed=2).execute(compiled)
@@ -0,0 +1,40 @@
+from core.context import GenerationContext
+from core.models import Condition
+from core.rules import CompiledRule
+
+
+def make_context():
+    return GenerationContext(
+        users={"id": [1, 2, 3, 2], "is_vip": [True, False, True, True]},
+    )
+
+
+def test_key_index_points_to_first_row():
+    context = make_context()
+    assert context.key_index("users") == {1: 0, 2: 1, 3: 2}
+    assert context.key_index("users") is context.key_index("users")
+
+
+def test_key_index_invalidated_on_key_change():
+    context = make_context()
+    index = context.key_index("users")
+    context.set_column("users", "id", [5, 6, 7, 8])
+    assert context.key_index("users") is not index
+    assert context.key_index("users")[8] == 3
+
+
+def test_key_index_kept_when_other_field_changes():
+    context = make_context()
+    index = context.key_index("users")
+    context.set_column("users", "is_vip", [False] * 4)
+    assert context.key_index("users") is index
+
+
+def test_rule_condition_uses_key_index():
+    context = make_context()
+    rule = CompiledRule.from_parts(condition=Condition(
+        entity="users", local_field="user_id", field="is_vip", op="eq", value=True
+    ))
+    # Повторяющийся id 2 указывает на первую запись (is_vip=False)
+    orders = {"user_id": [3, 2, 42, None]}
+    assert rule.mask(orders, context).tolist() == [True, False, False, False]
@@ -0,0 +1,97 @@
+import gzip
+import os
+
+from fastapi.testclient import TestClient
+
+from api import GENERATED_DIR
+from api.artifacts import artifact_etag, finalize_artifact, gzip_path, write_artifact
+from api.main import app
+
+client = TestClient(app)
+
+PAYLOAD = {
+    "response_mode": "file",
+    "blueprint": {"entities": {"users": {"count": 50, "fields": {
+        "id": {"type": "integer"},
+        "name": {"type": "string", "params": {"subtype": "name"}},
+    }}}},
+}
+
+
+def generate():
+    body = client.post("/api/generate", json=PAYLOAD).json()
+    filename = body["download_url"].split("/")[-1]
+    with open(os.path.join(GENERATED_DIR, filename), "rb") as f:
+        return body["download_url"], f.read()
+
+
+def test_gzip_variant_served_when_accepted():
+    url, raw = generate()
+    compressed = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.content == raw  # httpx распаковывает ответ сам
+    assert compressed.headers["etag"].endswith('-gzip"')
+
+    plain = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.content == raw
+    assert client.get(url, headers={"Accept-Encoding": "gzip;q=0"}).headers.get("content-encoding") is None
+
+
+def test_etag_conditional_request_returns_304():
+    url, _ = generate()
+    etag = client.get(url, headers={"Accept-Encoding": "identity"}).headers["etag"]
+    response = client.get(url, headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert client.get(url, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_etag_of_other_representation_does_not_match():
+    url, _ = generate()
+    etag = client.get(url, headers={"Accept-Encoding": "identity"}).headers["etag"]
+    # ETag JSON не подтверждает кэш gzip-варианта: это другие байты
+    response = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+
+
+def test_indexed_artifact_without_file_returns_404():
+    url, _ = generate()
+    filename = url.split("/")[-1]
+    os.remove(os.path.join(GENERATED_DIR, filename))
+    assert client.get(url).status_code == 404
+
+
+def test_range_request_resumes_download():
+    url, raw = generate()
+    headers = {"Accept-Encoding": "identity", "Range": "bytes=10-"}
+    response = client.get(url, headers=headers)
+    assert response.status_code == 206
+    assert response.content == raw[10:]
+    assert response.headers["content-range"] == f"bytes 10-{len(raw) - 1}/{len(raw)}"
+
+    etag = response.headers["etag"]
+    assert client.get(url, headers={**headers, "If-Range": etag}).status_code == 206
+    assert client.get(url, headers={**headers, "If-Range": '"stale"'}).status_code == 200
+
+
+def test_finalize_streamed_artifact(tmp_path):
+    path = tmp_path / "job.json"
+    path.write_bytes(b'{"users":[]}')
+    etag, size = finalize_artifact(str(path))
+    assert size == path.stat().st_size + os.path.getsize(gzip_path(str(path)))
+    assert gzip.decompress(open(gzip_path(str(path)), "rb").read()) == b'{"users":[]}'
+    assert artifact_etag(str(path)) == etag
+
+    path.write_bytes(b'{"users":[1]}')
+    assert artifact_etag(str(path)) != etag
+
+
+def test_write_artifact_replaces_file_atomically(tmp_path):
+    path = tmp_path / "result.json"
+    path.write_bytes(b'{"old":true}')
+    etag, _ = write_artifact(str(path), b'{"users":[]}')
+    assert path.read_bytes() == b'{"users":[]}'
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["result.json", "result.json.gz"]
+    assert artifact_etag(str(path)) == etag
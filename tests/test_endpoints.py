@@ -1,6 +1,8 @@
 import json
+import os
 import pytest
 from fastapi.testclient import TestClient
+from api import GENERATED_DIR
 from api.main import app
 
 client = TestClient(app)
@@ -47,6 +49,31 @@ def test_generate_success(simple_blueprint):
     assert "download_url" in data
 
 
+def test_generate_file_mode_returns_only_url_and_counts(simple_blueprint):
+    response = client.post("/api/generate", json={**simple_blueprint, "response_mode": "file"})
+    assert response.status_code == 200
+    body = response.json()
+    assert "data" not in body
+    assert body["counts"] == {"users": 3}
+    assert len(client.get(body["download_url"]).json()["users"]) == 3
+
+
+def test_generate_summary_mode_returns_preview(simple_blueprint):
+    inline = client.post("/api/generate", json=simple_blueprint).json()
+    summary = client.post(
+        "/api/generate", json={**simple_blueprint, "response_mode": "summary", "preview_rows": 2}
+    ).json()
+    assert "data" not in summary
+    assert summary["counts"] == {"users": 3}
+    assert summary["preview"]["users"] == inline["data"]["users"][:2]
+    assert summary["bytes"] == len(client.get(summary["download_url"]).content)
+
+
+def test_generate_rejects_unknown_response_mode(simple_blueprint):
+    response = client.post("/api/generate", json={**simple_blueprint, "response_mode": "bogus"})
+    assert response.status_code == 422
+
+
 def test_generate_invalid_request():
     """Проверяем, что при некорректных данных возвращается 422"""
     bad_json = {"invalid": "data"}
@@ -79,3 +106,70 @@ def test_download_nonexistent_file():
     """Запрос несуществующего файла должен вернуть 404"""
     response = client.get("/api/download/no_such_file.json")
     assert response.status_code == 404
+
+
+# --- /api/generate/stream --------------------------------------------------
+
+def test_generate_stream_ndjson(simple_blueprint):
+    """Каждая строка потока — отдельная запись с именем сущности"""
+    response = client.post("/api/generate/stream", json=simple_blueprint)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 3
+    assert all(line["entity"] == "users" for line in lines)
+    assert set(lines[0]["data"]) == {"id", "name", "is_vip"}
+
+
+def test_generate_stream_matches_generate(simple_blueprint):
+    streamed = client.post("/api/generate/stream", json=simple_blueprint)
+    regular = client.post("/api/generate", json=simple_blueprint)
+    rows = [json.loads(line)["data"] for line in streamed.text.splitlines()]
+    assert rows == regular.json()["data"]["users"]
+
+
+def test_generate_stream_invalid_blueprint():
+    payload = {"blueprint": {"entities": {"orders": {"count": 1, "fields": {
+        "user_id": {"type": "reference", "params": {"entity": "users", "field": "id"}}
+    }}}}}
+    response = client.post("/api/generate/stream", json=payload)
+    assert response.status_code == 400
+
+
+def test_generate_rejects_blueprint_over_sync_limit(simple_blueprint, monkeypatch):
+    monkeypatch.setattr("api.routes.generate.MAX_SYNC_ROWS", 2)
+    monkeypatch.setattr("api.routes.generate.LEGACY_MAX_ENTITY_COUNT", 2)
+    response = client.post("/api/generate", json=simple_blueprint)
+    assert response.status_code == 400
+    assert "/api/jobs" in response.json()["detail"]
+
+    # Потоковая генерация не собирает результат в памяти и лимиту не подчиняется
+    stream = client.post("/api/generate/stream", json=simple_blueprint)
+    assert stream.status_code == 200
+    assert len(stream.text.splitlines()) == 3
+
+
+def test_sync_limit_keeps_blueprints_valid_before_count_increase(monkeypatch):
+    # Сущности в пределах прежнего лимита count (5000) принимаются при любом MAX_SYNC_ROWS
+    monkeypatch.setattr("api.routes.generate.MAX_SYNC_ROWS", 10)
+    entities = {f"e{i}": {"count": 5, "fields": {"id": {"type": "integer"}}} for i in range(3)}
+    payload = {"blueprint": {"entities": entities}, "response_mode": "file"}
+    assert client.post("/api/generate", json=payload).status_code == 200
+
+    entities["e0"]["count"] = 5001
+    assert client.post("/api/generate", json=payload).status_code == 400
+
+
+def test_cached_summary_does_not_read_artifact(simple_blueprint):
+    payload = {**simple_blueprint, "seed": 4242, "response_mode": "summary", "preview_rows": 2}
+    first = client.post("/api/generate", json=payload).json()
+    filename = first["download_url"].rsplit("/", 1)[-1]
+    # Если бы ответ из кэша читал и разбирал файл, он бы упал на этом содержимом
+    with open(os.path.join(GENERATED_DIR, filename), "w") as f:
+        f.write("не JSON")
+
+    second = client.post("/api/generate", json=payload).json()
+    assert second["cached"] is True
+    assert second["bytes"] == first["bytes"]
+    assert second["preview"] == first["preview"]
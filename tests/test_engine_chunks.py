@@ -0,0 +1,127 @@
+import json
+
+import pytest
+
+from api.serialization import dumps
+from core.engine import DataGenerationEngine, retained_fields
+from core.models import Blueprint, MAX_ENTITY_COUNT, EntityDefinition, FieldDefinition, FieldType
+from core.utils import EmbeddedRows, columns_to_rows
+
+
+def make_blueprint(embed=False):
+    return Blueprint.from_dict({"entities": {
+        "users": {
+            "count": 10,
+            "fields": {
+                "id": {"type": "uuid"},
+                "is_vip": {"type": "boolean"},
+                "orders": {"type": "one_to_many",
+                           "params": {"entity": "orders", "foreign_field": "user_id", "embed": embed}},
+            },
+        },
+        "orders": {
+            "count": 25,
+            "fields": {
+                "id": {"type": "integer", "params": {"min": 1, "max": 10 ** 9}},
+                "price": {"type": "integer", "params": {"min": 10, "max": 500}},
+                "user_id": {"type": "reference", "params": {"entity": "users", "field": "id"}},
+            },
+            "rules": [{
+                "if": {"entity": "users", "local_field": "user_id", "field": "is_vip", "op": "eq", "value": True},
+                "then": {"action": "set", "field": "price", "min": 1000, "max": 1200},
+            }],
+        },
+        "shipments": {
+            "count": 30,
+            "fields": {"order_id": {"type": "reference", "params": {"entity": "orders", "field": "id"}}},
+        },
+    }})
+
+
+def collect(chunks):
+    result = {}
+    for entity_name, columns in chunks:
+        result.setdefault(entity_name, []).extend(columns_to_rows(columns))
+    return result
+
+
+def test_execute_iter_yields_fixed_size_chunks():
+    chunks = list(DataGenerationEngine(seed=1).execute_iter(make_blueprint(), chunk_size=7))
+    sizes = [(name, len(next(iter(columns.values())))) for name, columns in chunks]
+    assert sizes == [
+        ("orders", 7), ("orders", 7), ("orders", 7), ("orders", 4),
+        ("shipments", 7), ("shipments", 7), ("shipments", 7), ("shipments", 7), ("shipments", 2),
+        ("users", 7), ("users", 3),
+    ]
+
+
+@pytest.mark.parametrize("embed", [False, True])
+def test_execute_iter_matches_execute(embed):
+    bp = make_blueprint(embed)
+    chunked = collect(DataGenerationEngine(seed=3).execute_iter(bp, chunk_size=4))
+    assert chunked == DataGenerationEngine(seed=3).execute(bp)
+
+
+def make_nested_blueprint():
+    return Blueprint.from_dict({"entities": {
+        "users": {"count": 4, "fields": {
+            "id": {"type": "uuid"},
+            "orders": {"type": "one_to_many",
+                       "params": {"entity": "orders", "foreign_field": "user_id", "embed": True}},
+        }},
+        "orders": {"count": 12, "fields": {
+            "id": {"type": "uuid"},
+            "user_id": {"type": "reference", "params": {"entity": "users", "field": "id"}},
+            "items": {"type": "one_to_many",
+                      "params": {"entity": "items", "foreign_field": "order_id", "embed": True}},
+        }},
+        "items": {"count": 30, "fields": {
+            "order_id": {"type": "reference", "params": {"entity": "orders", "field": "id"}},
+        }},
+    }})
+
+
+def test_embedded_children_are_shared_not_copied():
+    columns = DataGenerationEngine(seed=2).execute(make_nested_blueprint(), columnar=True)
+
+    embedded = columns["users"]["orders"]
+    assert all(isinstance(children, EmbeddedRows) for children in embedded)
+    # Все родители ссылаются на одно колоночное хранилище заказов
+    assert len({id(children.columns) for children in embedded}) == 1
+    assert sorted(pos for children in embedded for pos in children.positions) == list(range(12))
+
+    order = next(children for children in embedded if children)[0]
+    assert {item["order_id"] for item in order["items"]} <= {order["id"]}
+
+
+def test_execute_returns_plain_embedded_lists():
+    bp = make_nested_blueprint()
+    result = DataGenerationEngine(seed=2).execute(bp)
+
+    user = next(user for user in result["users"] if user["orders"])
+    assert type(user["orders"]) is list
+    assert all(type(order["items"]) is list for order in user["orders"])
+    # Обычный json без api.serialization, результат совпадает с сериализацией колонок
+    assert json.loads(json.dumps(result)) == json.loads(dumps(
+        {name: columns_to_rows(columns) for name, columns in
+         DataGenerationEngine(seed=2).execute(bp, columnar=True).items()}
+    ))
+
+    # Записи — обычные dict: изменение вложенной записи сохраняется
+    user["orders"][0]["marked"] = True
+    assert user["orders"][0]["marked"] is True
+
+
+def test_execute_iter_rejects_bad_chunk_size():
+    with pytest.raises(ValueError):
+        list(DataGenerationEngine().execute_iter(make_blueprint(), chunk_size=0))
+
+
+def test_retained_fields_only_keeps_referenced_columns():
+    keep = retained_fields(make_blueprint())
+    assert keep == {"users": {"id", "is_vip"}, "orders": {"id"}}
+
+
+def test_entity_count_cap_is_configurable_and_high():
+    assert MAX_ENTITY_COUNT > 5000
+    EntityDefinition(count=100000, fields={"id": FieldDefinition(type=FieldType.INTEGER)})
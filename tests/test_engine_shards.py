@@ -0,0 +1,144 @@
+import os
+import pickle
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core import engine as engine_module
+from core.engine import DataGenerationEngine, shard_executors, topo_levels, topo_sort
+from core.models import Blueprint
+from core.utils import derive_seed
+
+
+def make_blueprint():
+    return Blueprint.from_dict({"entities": {
+        "users": {
+            "count": 120,
+            "fields": {
+                "id": {"type": "uuid"},
+                "name": {"type": "string", "params": {"max_length": 30}},
+                "email": {"type": "email"},
+                "score": {"type": "float", "params": {"min": 0, "max": 10}},
+            },
+        },
+        "orders": {
+            "count": 250,
+            "fields": {
+                "id": {"type": "integer", "params": {"min": 1, "max": 10 ** 9}},
+                "user_id": {"type": "reference", "params": {"entity": "users", "field": "id"}},
+            },
+        },
+    }})
+
+
+def test_derive_seed_is_stable_and_distinct():
+    assert derive_seed(42, "users", 0) == derive_seed(42, "users", 0)
+    assert derive_seed(42, "users", 0) != derive_seed(42, "users", 1)
+    assert derive_seed(42, "users", 0) != derive_seed(42, "orders", 0)
+
+
+def test_output_independent_of_worker_count():
+    bp = make_blueprint()
+    single = DataGenerationEngine(seed=5, workers=1, shard_size=40).execute(bp)
+    pooled = DataGenerationEngine(seed=5, workers=2, shard_size=40).execute(bp)
+    assert single == pooled
+
+
+def test_output_independent_of_chunk_size():
+    bp = make_blueprint()
+    whole = DataGenerationEngine(seed=9, shard_size=40).execute(bp, columnar=True)
+    chunks = {}
+    for name, columns in DataGenerationEngine(seed=9, shard_size=40).execute_iter(bp, chunk_size=33):
+        for field, values in columns.items():
+            chunks.setdefault(name, {}).setdefault(field, []).extend(values)
+    assert chunks == whole
+
+
+def test_shards_use_distinct_seeds():
+    bp = make_blueprint()
+    users = DataGenerationEngine(seed=5, shard_size=40).execute(bp)["users"]
+    assert len({u["id"] for u in users}) == 120
+    assert [u["name"] for u in users[:40]] != [u["name"] for u in users[40:80]]
+
+
+def test_shard_executor_is_reused_between_runs():
+    bp = make_blueprint()
+    DataGenerationEngine(seed=1, workers=2, shard_size=40).execute(bp)
+    executor = shard_executors.get(2)
+    DataGenerationEngine(seed=2, workers=2, shard_size=40).execute(bp)
+    assert shard_executors.get(2) is executor
+
+
+def test_shard_context_is_published_once(monkeypatch):
+    published = []
+    original = DataGenerationEngine._publish_context
+
+    def publish(self, context):
+        path = original(self, context)
+        published.append(path)
+        return path
+
+    monkeypatch.setattr(DataGenerationEngine, "_publish_context", publish)
+    engine = DataGenerationEngine(seed=3, workers=2, shard_size=20)
+    engine.execute(make_blueprint())
+
+    # Один файл на сущность со ссылками (orders), а не на каждый из 13 шардов; после генерации удалён
+    assert len(published) == 1
+    assert not os.path.exists(published[0])
+    assert not engine._inflight
+
+
+def test_worker_loads_context_once(tmp_path, monkeypatch):
+    context = {"users": {"id": [1, 2, 3]}}
+    path = str(tmp_path / "context.pickle")
+    with open(path, "wb") as f:
+        pickle.dump(context, f)
+
+    monkeypatch.setattr(engine_module, "_worker_contexts", engine_module.OrderedDict())
+    first = engine_module._load_shard_context(path)
+    os.remove(path)
+    assert engine_module._load_shard_context(path) is first
+
+
+def test_invalid_shard_size():
+    with pytest.raises(ValueError):
+        DataGenerationEngine(shard_size=0)
+
+
+def make_star_blueprint():
+    return Blueprint.from_dict({"entities": {
+        "sales": {"count": 60, "fields": {
+            "user_id": {"type": "reference", "params": {"entity": "users", "field": "id"}},
+            "product_id": {"type": "reference", "params": {"entity": "products", "field": "id"}},
+            "warehouse_id": {"type": "reference", "params": {"entity": "warehouses", "field": "id"}},
+        }},
+        "users": {"count": 30, "fields": {"id": {"type": "uuid"}, "name": {"type": "string"}}},
+        "products": {"count": 20, "fields": {"id": {"type": "integer"}, "price": {"type": "float"}}},
+        "warehouses": {"count": 5, "fields": {"id": {"type": "integer"}, "city": {"type": "string"}}},
+    }})
+
+
+def test_topo_levels_group_independent_entities():
+    assert topo_levels(make_star_blueprint()) == [["users", "products", "warehouses"], ["sales"]]
+    assert topo_sort(make_star_blueprint()) == ["users", "products", "warehouses", "sales"]
+
+
+def test_level_parallel_output_matches_sequential():
+    bp = make_star_blueprint()
+    sequential = DataGenerationEngine(seed=21, shard_size=16).execute(bp)
+    parallel = DataGenerationEngine(seed=21, workers=3, shard_size=16).execute(bp)
+    assert parallel == sequential
+
+
+def test_seeded_requests_reproducible_across_threads():
+    bp = make_blueprint()
+    seeds = list(range(8)) * 2
+    expected = {seed: DataGenerationEngine(seed=seed, shard_size=64).execute(bp) for seed in set(seeds)}
+
+    state = random.getstate()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda seed: DataGenerationEngine(seed=seed, shard_size=64).execute(bp), seeds))
+    assert all(result == expected[seed] for seed, result in zip(seeds, results))
+    # Глобальный random запросами не затрагивается
+    assert random.getstate() == state
@@ -0,0 +1,37 @@
+from core.engine import DataGenerationEngine
+from core.faker_pool import FakerPool, faker_pool
+from core.models import Blueprint
+
+
+def test_released_instance_is_reused_and_reseeded():
+    pool = FakerPool()
+    first = pool.checkout("en_US", seed=3)
+    name = first.name()
+    pool.release(first)
+
+    second = pool.checkout("en_US", seed=3)
+    assert second is first
+    assert second.name() == name
+    assert pool.created == 1
+
+
+def test_pool_keeps_instances_per_locale_up_to_limit():
+    pool = FakerPool(max_idle=1)
+    pool.warm(["en_US", "ru_RU"])
+    assert pool.idle("en_US") == 1 and pool.idle("ru_RU") == 1
+
+    with pool.acquire("ru_RU") as faker:
+        assert faker.locales == ["ru_RU"]
+        assert pool.idle("ru_RU") == 0
+    pool.release(pool._create("ru_RU"))
+    assert pool.idle("ru_RU") == 1
+
+
+def test_engine_returns_faker_to_pool():
+    bp = Blueprint.from_dict({"entities": {"users": {"count": 2, "fields": {"id": {"type": "integer"}}}}})
+    faker_pool.warm(["en_US"])
+    idle = faker_pool.idle("en_US")
+    engine = DataGenerationEngine(seed=1)
+    engine.execute(bp)
+    assert faker_pool.idle("en_US") == idle
+    assert engine._faker is None
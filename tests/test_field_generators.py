@@ -0,0 +1,145 @@
+import uuid
+
+import pytest
+from faker import Faker
+
+from core.engine import DataGenerationEngine
+from core.generators import (
+    IntegerFieldGenerator, FloatFieldGenerator, BooleanFieldGenerator, UUIDFieldGenerator,
+    StringFieldGenerator, ReferenceFieldGenerator, EmailFieldGenerator
+)
+from core.context import GenerationContext
+from core.pools import ValuePoolRegistry, value_pools
+from core.models import Blueprint, EntityDefinition, FieldDefinition, FieldType
+
+
+def seeded_faker(seed=42):
+    faker = Faker()
+    faker.seed_instance(seed)
+    return faker
+
+
+def test_integer_batch_respects_bounds():
+    values = IntegerFieldGenerator(seeded_faker(), {"min": 5, "max": 7}).generate_batch(500)
+    assert len(values) == 500
+    assert all(isinstance(v, int) for v in values)
+    assert set(values) == {5, 6, 7}
+
+
+def test_integer_batch_beyond_int64_falls_back_to_faker():
+    params = {"min": 10**19, "max": 10**20}
+    values = IntegerFieldGenerator(seeded_faker(), params).generate_batch(50)
+    assert all(10**19 <= v <= 10**20 for v in values)
+    assert values == IntegerFieldGenerator(seeded_faker(), params).generate_batch(50)
+
+
+def test_float_batch_respects_bounds_and_precision():
+    params = {"min": 1.5, "max": 2.5, "precision": 1}
+    values = FloatFieldGenerator(seeded_faker(), params).generate_batch(500)
+    assert all(isinstance(v, float) for v in values)
+    assert all(1.5 <= v <= 2.5 for v in values)
+    assert all(round(v, 1) == v for v in values)
+
+
+def test_float_batch_rounds_after_clipping():
+    values = FloatFieldGenerator(seeded_faker(), {"min": 0.001, "max": 0.02, "precision": 2}).generate_batch(500)
+    # Значения у границы min округляются, а не остаются 0.001
+    assert set(values) <= {0.0, 0.01, 0.02}
+
+
+def test_boolean_batch_returns_python_bools():
+    values = BooleanFieldGenerator(seeded_faker(), {}).generate_batch(200)
+    assert all(type(v) is bool for v in values)
+    assert set(values) == {True, False}
+
+
+def test_vectorized_generators_are_deterministic_by_seed():
+    bp = Blueprint(
+        entities={
+            "items": EntityDefinition(
+                count=50,
+                fields={
+                    "qty": FieldDefinition(type=FieldType.INTEGER, params={"min": 0, "max": 100}),
+                    "price": FieldDefinition(type=FieldType.FLOAT, params={"precision": 3}),
+                    "active": FieldDefinition(type=FieldType.BOOLEAN),
+                },
+            )
+        }
+    )
+    first = DataGenerationEngine(seed=11).execute(bp)
+    second = DataGenerationEngine(seed=11).execute(bp)
+    other = DataGenerationEngine(seed=12).execute(bp)
+    assert first == second
+    assert first != other
+
+
+def test_uuid_batch_produces_valid_v4():
+    values = UUIDFieldGenerator(seeded_faker(), {}).generate_batch(100)
+    assert len(set(values)) == 100
+    for value in values:
+        parsed = uuid.UUID(value)
+        assert str(parsed) == value
+        assert parsed.version == 4
+        assert parsed.variant == uuid.RFC_4122
+
+
+def test_uuid_batch_is_reproducible():
+    first = UUIDFieldGenerator(seeded_faker(3), {}).generate_batch(10)
+    second = UUIDFieldGenerator(seeded_faker(3), {}).generate_batch(10)
+    assert first == second
+    assert UUIDFieldGenerator(seeded_faker(3), {}).generate_batch(0) == []
+
+
+def test_value_pool_is_unique_shared_and_bounded():
+    pools = ValuePoolRegistry(pool_size=50, max_pools=2)
+    names = pools.get("en_US", "name")
+    assert len(names) == 50
+    assert len(set(names.tolist())) == 50
+    assert pools.get("en_US", "name") is names
+
+    pools.get("en_US", "email")
+    pools.get("en_US", "job")
+    assert ("en_US", "name") not in pools._pools
+    assert len(pools._pools) == 2
+
+
+def test_value_pool_rejects_unknown_subtype():
+    with pytest.raises(ValueError):
+        ValuePoolRegistry(pool_size=10).get("en_US", "phone")
+
+
+def test_string_subtype_sampled_from_pool_is_reproducible():
+    gen = StringFieldGenerator(seeded_faker(5), {"subtype": "email"})
+    values = gen.generate_batch(20)
+    assert set(values) <= set(value_pools.get("en_US", "email").tolist())
+    assert StringFieldGenerator(seeded_faker(5), {"subtype": "email"}).generate_batch(20) == values
+
+
+def test_email_type_is_not_pooled():
+    values = EmailFieldGenerator(seeded_faker(5), {}).generate_batch(5000)
+    assert len(set(values)) > 4500
+    assert not set(values) <= set(value_pools.get("en_US", "email").tolist())
+
+
+def test_reference_batch_gathers_from_parent_column():
+    context = GenerationContext(users={"id": [10, 20, 30]})
+    gen = ReferenceFieldGenerator(seeded_faker(), {"entity": "users", "field": "id"}, context)
+    values = gen.generate_batch(100)
+    assert set(values) == {10, 20, 30}
+    assert all(type(v) is int for v in values)
+
+
+def test_reference_batch_sees_replaced_column():
+    context = GenerationContext(users={"id": [1, 2]})
+    gen = ReferenceFieldGenerator(seeded_faker(), {"entity": "users", "field": "id"}, context)
+    assert set(gen.generate_batch(20)) == {1, 2}
+    context.set_column("users", "id", [7])
+    assert set(gen.generate_batch(5)) == {7}
+
+
+def test_reference_batch_errors():
+    context = GenerationContext(users={"id": []})
+    with pytest.raises(ValueError, match="Нет доступных записей"):
+        ReferenceFieldGenerator(seeded_faker(), {"entity": "users", "field": "id"}, context).generate_batch(1)
+    with pytest.raises(ValueError, match="не найдена"):
+        ReferenceFieldGenerator(seeded_faker(), {"entity": "orders", "field": "id"}, context).generate_batch(1)
@@ -108,6 +108,33 @@ def test_one_to_many_generation():
     assert isinstance(users[0]["orders"], list)
 
 
+def test_columnar_execute_returns_columns():
+    bp = make_blueprint_with_reference()
+    result = DataGenerationEngine(seed=42).execute(bp, columnar=True)
+    assert set(result["orders"].keys()) == {"id", "user_id"}
+    assert len(result["orders"]["id"]) == 4
+    assert set(result["orders"]["user_id"]) <= set(result["users"]["id"])
+
+
+def test_columnar_and_row_modes_match():
+    bp = make_blueprint_with_one_to_many()
+    rows = DataGenerationEngine(seed=7).execute(bp)
+    columns = DataGenerationEngine(seed=7).execute(bp, columnar=True)
+    from core.utils import columns_to_rows
+    assert {name: columns_to_rows(cols) for name, cols in columns.items()} == rows
+
+
+def test_generate_batch_falls_back_to_generate():
+    from faker import Faker
+    from core.fields import FieldValueGenerator
+
+    class ConstGenerator(FieldValueGenerator):
+        def generate(self):
+            return 1
+
+    assert ConstGenerator(Faker(), {}).generate_batch(3) == [1, 1, 1]
+
+
 # ---------- 2. VALIDATORS ---------- #
 
 def test_validate_rules_no_error():
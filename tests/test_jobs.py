@@ -0,0 +1,160 @@
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import jobs
+from api.jobs import DONE, QUEUED, RUNNING, JobManager, JobStore, run_job
+from api.main import app
+from core.models import GenerationRequest
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def job_manager(tmp_path, monkeypatch):
+    """Очередь задач теста — в tmp_path, а не в jobs/ рабочей копии."""
+    manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite3")))
+    monkeypatch.setattr(jobs, "_manager", manager)
+    yield manager
+    manager.shutdown()
+
+
+@pytest.fixture
+def job_payload():
+    return {
+        "seed": 7,
+        "blueprint": {
+            "entities": {
+                "users": {"count": 5, "fields": {"id": {"type": "integer"}, "name": {"type": "string"}}},
+                "orders": {"count": 8, "fields": {
+                    "id": {"type": "integer"},
+                    "user_id": {"type": "reference", "params": {"entity": "users", "field": "id"}},
+                }},
+            }
+        },
+    }
+
+
+def wait_for(job_id, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = client.get(f"/api/jobs/{job_id}").json()
+        if status["status"] not in (QUEUED, RUNNING):
+            return status
+        time.sleep(0.2)
+    raise AssertionError(f"Задача {job_id} не завершилась за {timeout}s")
+
+
+def test_job_lifecycle(job_payload):
+    response = client.post("/api/jobs", json=job_payload)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    status = wait_for(job_id)
+    assert status["status"] == DONE
+    assert status["progress"] == 1.0
+
+    result = client.get(f"/api/jobs/{job_id}/result")
+    assert result.status_code == 200
+    downloaded = client.get(result.json()["download_url"]).json()
+    assert len(downloaded["users"]) == 5
+    assert len(downloaded["orders"]) == 8
+
+
+def test_job_invalid_blueprint(job_payload):
+    job_payload["blueprint"]["entities"]["orders"]["fields"]["user_id"]["params"]["entity"] = "nobody"
+    response = client.post("/api/jobs", json=job_payload)
+    assert response.status_code == 400
+
+
+def test_unknown_job():
+    assert client.get("/api/jobs/nope").status_code == 404
+    assert client.get("/api/jobs/nope/result").status_code == 404
+
+
+def test_job_store_persists_unfinished_jobs(tmp_path, job_payload):
+    path = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(path)
+    job_id = store.create(GenerationRequest.model_validate(job_payload))
+    store.update(job_id, status=RUNNING, progress=0.5)
+
+    reopened = JobStore(path)
+    assert [job["id"] for job in reopened.unfinished()] == [job_id]
+    assert reopened.get(job_id)["progress"] == 0.5
+
+
+def test_job_manager_recovers_from_dead_worker(job_manager, job_payload):
+    # Гибель воркера (как при OOM) ломает пул процессов
+    with pytest.raises(BrokenProcessPool):
+        job_manager._get_executor().submit(os._exit, 1).result(timeout=60)
+
+    response = client.post("/api/jobs", json=job_payload)
+    assert response.status_code == 202
+    assert wait_for(response.json()["job_id"])["status"] == DONE
+
+
+def test_job_marked_failed_when_pool_cannot_start(job_manager, job_payload, monkeypatch):
+    def broken(job_id):
+        raise BrokenProcessPool("воркер погиб")
+
+    monkeypatch.setattr(job_manager, "_submit", broken)
+    response = client.post("/api/jobs", json=job_payload)
+    assert response.status_code == 202
+    status = client.get(f"/api/jobs/{response.json()['job_id']}").json()
+    assert status["status"] == "failed"
+
+
+def test_run_job_uses_engine_workers(tmp_path, job_payload, monkeypatch):
+    workers = []
+    original = jobs.DataGenerationEngine.__init__
+
+    def init(self, *args, **kwargs):
+        workers.append(kwargs.get("workers"))
+        original(self, *args, **kwargs)
+
+    monkeypatch.setattr(jobs, "ENGINE_WORKERS", 2)
+    monkeypatch.setattr(jobs.DataGenerationEngine, "__init__", init)
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create(GenerationRequest.model_validate(job_payload))
+
+    run_job(job_id, store.path)
+    assert workers == [2]
+    assert store.get(job_id)["status"] == DONE
+
+
+def test_run_job_publishes_artifact_atomically(tmp_path, job_payload, monkeypatch):
+    monkeypatch.setattr(jobs, "GENERATED_DIR", str(tmp_path))
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create(GenerationRequest.model_validate(job_payload))
+    final = tmp_path / f"blueprint_{job_id}.json"
+    original = jobs.write_dataset
+    seen = []
+
+    def write(chunks, path, on_chunk=None):
+        original(chunks, path, on_chunk)
+        # Недописанный файл не лежит под именем, доступным скачиванию
+        seen.append(final.exists())
+
+    monkeypatch.setattr(jobs, "write_dataset", write)
+    run_job(job_id, store.path)
+    assert seen == [False]
+    assert sorted(p.name for p in tmp_path.glob("blueprint_*")) == [final.name, final.name + ".gz"]
+
+
+def test_failed_job_leaves_no_partial_file(tmp_path, job_payload, monkeypatch):
+    monkeypatch.setattr(jobs, "GENERATED_DIR", str(tmp_path))
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create(GenerationRequest.model_validate(job_payload))
+
+    def write(chunks, path, on_chunk=None):
+        with open(path, "wb") as f:
+            f.write(b'{"users":[')
+        raise MemoryError
+
+    monkeypatch.setattr(jobs, "write_dataset", write)
+    with pytest.raises(MemoryError):
+        run_job(job_id, store.path)
+    assert list(tmp_path.glob("blueprint_*")) == []
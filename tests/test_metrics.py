@@ -0,0 +1,123 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.metrics import MetricsRegistry
+from core.engine import DataGenerationEngine
+from core.models import Blueprint
+
+client = TestClient(app)
+
+
+def sample(text: str, line_prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_counters_are_summed_across_threads():
+    registry = MetricsRegistry()
+    registry.counter("hits_total", "Попадания")
+
+    def work():
+        for _ in range(1000):
+            registry.inc("hits_total", route="a")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    text = registry.render()
+    assert "# TYPE hits_total counter" in text
+    assert sample(text, 'hits_total{route="a"}') == 4000
+
+
+def test_shards_of_finished_threads_are_folded():
+    registry = MetricsRegistry()
+    registry.counter("hits_total", "Попадания")
+    registry.histogram("latency_seconds", "Время", buckets=(1.0,))
+
+    def work():
+        registry.inc("hits_total")
+        registry.observe("latency_seconds", 0.5)
+
+    for _ in range(200):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+
+    text = registry.render()
+    assert len(registry._shards) <= 1
+    assert sample(text, "hits_total") == 200
+    assert sample(text, 'latency_seconds_bucket{le="1"}') == 200
+    assert sample(text, "latency_seconds_sum") == 100
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    registry.histogram("latency_seconds", "Время", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        registry.observe("latency_seconds", value)
+
+    text = registry.render()
+    assert sample(text, 'latency_seconds_bucket{le="0.1"}') == 1
+    assert sample(text, 'latency_seconds_bucket{le="1"}') == 3
+    assert sample(text, 'latency_seconds_bucket{le="+Inf"}') == 4
+    assert sample(text, "latency_seconds_count") == 4
+    assert sample(text, "latency_seconds_sum") == 6.05
+
+
+def test_collector_and_label_escaping():
+    registry = MetricsRegistry()
+    registry.gauge("queue", "Очередь")
+    registry.collector("queue", lambda: [({"name": 'a"b'}, 3)])
+    assert 'queue{name="a\\"b"} 3' in registry.render()
+
+
+def test_engine_records_entity_seconds():
+    engine = DataGenerationEngine(seed=1, shard_size=50)
+    engine.execute(Blueprint.from_dict({"entities": {
+        "users": {"count": 120, "fields": {"id": {"type": "uuid"}}},
+    }}))
+    assert engine.entity_seconds["users"] > 0
+
+
+def test_metrics_endpoint_tracks_generate_and_download():
+    before = client.get("/api/metrics").text
+    response = client.post("/api/generate", json={
+        "blueprint": {"entities": {"metric_users": {"count": 25, "fields": {"id": {"type": "integer"}}}}},
+        "response_mode": "file",
+    })
+    client.get(response.json()["download_url"])
+    client.get("/api/download/missing.json")
+
+    response = client.get("/api/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+
+    def delta(prefix):
+        return sample(text, prefix) - sample(before, prefix)
+
+    assert delta('sdg_requests_total{route="generate",status="200"}') == 1
+    assert delta('sdg_requests_total{route="download",status="404"}') == 1
+    assert delta('sdg_request_duration_seconds_count{route="download"}') == 2
+    assert delta('sdg_rows_generated_total{entity="metric_users"}') == 25
+    assert sample(text, 'sdg_entity_rows_per_second_count{entity="metric_users"}') >= 1
+    assert delta("sdg_artifact_bytes_written_total") > 0
+    assert "sdg_result_cache_requests_total" in text
+    assert "# TYPE sdg_jobs gauge" in text
+
+
+def test_failed_generation_counted_as_400():
+    before = client.get("/api/metrics").text
+    client.post("/api/generate", json={"blueprint": {"entities": {"a": {"count": 1, "fields": {
+        "ref": {"type": "reference", "params": {"entity": "missing", "field": "id"}},
+    }}}}})
+    text = client.get("/api/metrics").text
+    prefix = 'sdg_requests_total{route="generate",status="400"}'
+    assert sample(text, prefix) - sample(before, prefix) == 1
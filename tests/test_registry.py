@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from faker import Faker
+
+from core.context import GenerationContext
+from core.fields import FieldValueGenerator
+from core.generators import ReferenceFieldGenerator, StringFieldGenerator
+from core.models import FieldType
+from core.registry import GeneratorRegistry, registry
+
+
+class BrokenGenerator(FieldValueGenerator):
+    def __init__(self, faker, params):
+        super().__init__(faker, params)
+        raise TypeError("ошибка внутри конструктора")
+
+    def generate(self):
+        return None
+
+
+class LegacyGenerator(FieldValueGenerator):
+    """Генератор без объявленных возможностей: context распознаётся по сигнатуре."""
+
+    def __init__(self, faker, params, context):
+        super().__init__(faker, params)
+        self.context = context
+
+    def generate(self):
+        return None
+
+
+def test_builtin_generators_declare_capabilities():
+    reference = registry.get_spec(FieldType.REFERENCE)
+    assert reference.generator_cls is ReferenceFieldGenerator
+    assert reference.requires_context and reference.supports_batch
+    assert not reference.requires_field_name
+    assert registry.get_spec("string").requires_field_name
+    assert not registry.get_spec("one_to_many").uses_rng
+
+
+def test_factory_passes_only_required_arguments():
+    context = GenerationContext()
+    string = registry.create_instance("string", Faker(), {}, context=context, field_name="title")
+    assert isinstance(string, StringFieldGenerator)
+    assert string.field_name == "title"
+
+    reference = registry.create_instance(
+        "reference", Faker(), {"entity": "users", "field": "id"}, context=context, field_name="user_id"
+    )
+    assert reference.context is context
+
+
+def test_factory_injects_rng_for_rng_generators():
+    rng = np.random.default_rng(1)
+    generator = registry.create_from_class(registry.get_generator("integer"), Faker(), {}, rng=rng)
+    assert generator.rng is rng
+
+
+def test_constructor_type_error_is_not_swallowed():
+    local = GeneratorRegistry()
+    local.register(FieldType.STRING)(BrokenGenerator)
+    with pytest.raises(TypeError, match="внутри конструктора"):
+        local.create_instance("string", Faker(), {})
+
+
+def test_legacy_generator_capabilities_resolved_from_signature():
+    local = GeneratorRegistry()
+    local.register(FieldType.REFERENCE)(LegacyGenerator)
+    assert local.get_spec(FieldType.REFERENCE).requires_context
+    assert local.create_instance("reference", Faker(), {}, context="ctx").context == "ctx"
+
+
+def test_register_rejects_mismatched_declaration():
+    class NoContext(FieldValueGenerator):
+        requires_context = True
+
+        def generate(self):
+            return None
+
+    with pytest.raises(TypeError, match="requires 'context'"):
+        GeneratorRegistry().register(FieldType.STRING)(NoContext)
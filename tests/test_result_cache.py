@@ -0,0 +1,81 @@
+import copy
+
+from fastapi.testclient import TestClient
+
+from api.cache import ResultCache
+from api.main import app
+from core.models import GenerationRequest
+
+client = TestClient(app)
+
+PAYLOAD = {
+    "seed": 99,
+    "blueprint": {"entities": {"users": {"count": 3, "fields": {
+        "id": {"type": "integer"},
+        "name": {"type": "string", "params": {"subtype": "name"}},
+    }}}},
+}
+
+
+def test_identical_seeded_requests_hit_cache():
+    first = client.post("/api/generate", json=PAYLOAD).json()
+    second = client.post("/api/generate", json=PAYLOAD).json()
+    assert second["cached"] is True
+    assert second["download_url"] == first["download_url"]
+    assert second["data"] == first["data"]
+
+
+def test_unseeded_requests_are_not_cached():
+    payload = copy.deepcopy(PAYLOAD)
+    del payload["seed"]
+    first = client.post("/api/generate", json=payload).json()
+    second = client.post("/api/generate", json=payload).json()
+    assert not second["cached"]
+    assert second["download_url"] != first["download_url"]
+
+
+def test_cache_key_depends_on_blueprint_and_seed():
+    request = GenerationRequest.model_validate(PAYLOAD)
+    with_defaults = GenerationRequest.model_validate({"seed": 99, "blueprint": {"entities": {"users": {
+        "count": 3,
+        "fields": {
+            "id": {"type": "integer", "params": {}},
+            "name": {"type": "string", "params": {"subtype": "name"}},
+        },
+        "rules": [],
+    }}}})
+    reordered = GenerationRequest.model_validate({"seed": 99, "blueprint": {"entities": {"users": {
+        "fields": {"name": {"type": "string", "params": {"subtype": "name"}}, "id": {"type": "integer"}},
+        "count": 3,
+    }}}})
+    other_seed = GenerationRequest.model_validate({**PAYLOAD, "seed": 100})
+    assert ResultCache.key(request) == ResultCache.key(with_defaults)
+    assert ResultCache.key(request) != ResultCache.key(other_seed)
+    assert ResultCache.key(GenerationRequest.model_validate({**PAYLOAD, "seed": None})) is None
+    # Порядок полей влияет на результат генерации, поэтому входит в ключ
+    assert ResultCache.key(reordered) != ResultCache.key(request)
+
+
+def test_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr("api.cache.GENERATED_DIR", str(tmp_path))
+    for name in ("a.json", "b.json", "c.json"):
+        (tmp_path / name).write_text("{}")
+
+    cache = ResultCache(max_entries=2, max_bytes=100)
+    cache.put("a", "a.json", 10)
+    cache.put("b", "b.json", 10)
+    assert cache.get("a") == "a.json"
+    cache.put("c", "c.json", 10)
+    assert cache.get("b") is None
+    assert cache.get("a") == "a.json"
+
+    cache.put("big", "c.json", 95)
+    assert len(cache) == 1
+
+
+def test_cache_drops_entries_for_deleted_files(tmp_path, monkeypatch):
+    monkeypatch.setattr("api.cache.GENERATED_DIR", str(tmp_path))
+    cache = ResultCache()
+    cache.put("gone", "gone.json", 1)
+    assert cache.get("gone") is None
+    assert len(cache) == 0
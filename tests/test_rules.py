@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+from faker import Faker
+
+from core.context import GenerationContext
+from core.engine import DataGenerationEngine
+from core.models import Action, Blueprint, Rule
+from core.rules import CompiledRule
+from core.utils import apply_action, match_condition
+
+
+def make_rule(op="eq", value=True, field="is_vip", action="set", min=1000, max=1200):
+    return Rule.from_dict({
+        "if": {"entity": "users", "local_field": "user_id", "field": field, "op": op, "value": value},
+        "then": {"action": action, "field": "price", "min": min, "max": max},
+    })
+
+
+def make_context():
+    return GenerationContext(
+        users={"id": [1, 2, 3], "is_vip": [True, False, True], "age": [20, 35, None]},
+        orders={"user_id": [1, 2, 3, 4, None], "price": [10, 20, 30, 40, 50]},
+    )
+
+
+@pytest.mark.parametrize("op, value, field, expected", [
+    ("eq", True, "is_vip", [True, False, True, False, False]),
+    ("neq", True, "is_vip", [False, True, False, False, False]),
+    ("gt", 25, "age", [False, True, False, False, False]),
+    ("lt", 25, "age", [True, False, False, False, False]),
+    ("in", [20, 35], "age", [True, True, False, False, False]),
+    ("eq", False, "is_vip", [False, True, False, False, False]),
+])
+def test_compiled_rule_mask(op, value, field, expected):
+    context = make_context()
+    rule = CompiledRule(make_rule(op=op, value=value, field=field))
+    assert rule.mask(context["orders"], context).tolist() == expected
+
+
+@pytest.mark.parametrize("op, value, expected", [
+    ("eq", ["a", "b"], [False, True, False, False, False]),
+    ("eq", ["a", "b", "c"], [False, False, False, False, False]),
+    ("neq", ["a", "b"], [True, False, True, False, False]),
+    ("eq", ("a", "b"), [False, False, False, False, False]),
+])
+def test_compiled_rule_compares_sequence_value_whole(op, value, expected):
+    context = make_context()
+    context.set_column("users", "tags", [["a"], ["a", "b"], "abc"])
+    rule = CompiledRule(make_rule(op=op, value=value, field="tags"))
+    assert rule.mask(context["orders"], context).tolist() == expected
+
+
+def test_compiled_set_rule_updates_only_masked_rows():
+    context = make_context()
+    CompiledRule(make_rule()).apply(context["orders"], context, np.random.default_rng(0))
+    prices = context["orders"]["price"]
+    assert 1000 <= prices[0] <= 1200 and 1000 <= prices[2] <= 1200
+    assert [prices[1], prices[3], prices[4]] == [20, 40, 50]
+
+
+def test_compiled_adjust_rule_raises_values_below_min():
+    context = make_context()
+    rule = CompiledRule(make_rule(op="neq", value=True, action="adjust", min=15, max=16))
+    rule.apply(context["orders"], context, np.random.default_rng(0))
+    assert context["orders"]["price"] == [10, 20, 30, 40, 50]
+
+    rule = CompiledRule(make_rule(op="neq", value=True, action="adjust", min=25, max=26))
+    rule.apply(context["orders"], context, np.random.default_rng(0))
+    assert context["orders"]["price"][1] in (25, 26)
+
+
+def test_compiled_set_rule_beyond_int64():
+    context = make_context()
+    rule = CompiledRule(make_rule(min=10**19, max=10**20))
+    rule.apply(context["orders"], context, np.random.default_rng(0))
+    prices = context["orders"]["price"]
+    assert 10**19 <= prices[0] <= 10**20 and 10**19 <= prices[2] <= 10**20
+    assert prices[1] == 20
+
+
+def test_rule_parts_without_condition_or_action():
+    context = make_context()
+    orders = context["orders"]
+    assert not CompiledRule.from_parts(action=Action(action="set", field="price")).mask(orders, context).any()
+
+    rule = CompiledRule.from_parts(condition=make_rule().if_)
+    rule.apply(orders, context, np.random.default_rng(0))
+    assert orders["price"] == [10, 20, 30, 40, 50]
+
+
+def test_row_helpers_delegate_to_compiled_rule():
+    rule = make_rule(action="adjust", min=25, max=26)
+    rows = {"users": [{"id": 1, "is_vip": True}, {"id": 2, "is_vip": False}]}
+    assert match_condition({"user_id": 1}, rows, rule.if_)
+    assert not match_condition({"user_id": 2}, rows, rule.if_)
+    assert not match_condition({"user_id": 1}, {"users": [{"id": 1, "is_vip": False}]}, rule.if_)
+
+    order = {"price": 10}
+    apply_action(order, Faker(), rule.then)
+    assert order["price"] in (25, 26)
+    order = {"price": 30}
+    apply_action(order, Faker(), rule.then)
+    assert order == {"price": 30}
+
+
+def test_rules_applied_to_every_entity():
+    bp = Blueprint.from_dict({"entities": {
+        "users": {"count": 5, "fields": {"id": {"type": "integer"}, "is_vip": {"type": "boolean"}}},
+        "orders": {
+            "count": 20,
+            "fields": {
+                "id": {"type": "integer"},
+                "price": {"type": "integer", "params": {"min": 10, "max": 500}},
+                "user_id": {"type": "reference", "params": {"entity": "users", "field": "id"}},
+            },
+            "rules": [make_rule().to_dict()],
+        },
+        "shipments": {"count": 3, "fields": {
+            "order_id": {"type": "reference", "params": {"entity": "orders", "field": "id"}},
+        }},
+    }})
+    result = DataGenerationEngine(seed=1).execute(bp)
+    assert list(result)[-1] == "shipments"
+    vip = {u["id"] for u in result["users"] if u["is_vip"]}
+    for order in result["orders"]:
+        assert (order["price"] >= 1000) == (order["user_id"] in vip)
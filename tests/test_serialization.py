@@ -0,0 +1,69 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import serialization
+from api.main import app
+from api.serialization import dumps, envelope
+from core.utils import EmbeddedRows
+
+client = TestClient(app)
+
+
+def test_dumps_is_compact_utf8(monkeypatch):
+    monkeypatch.setattr(serialization, "JSON_BACKEND", "json")
+    assert dumps({"name": "Иван", "ids": [1, 2]}) == '{"name":"Иван","ids":[1,2]}'.encode("utf-8")
+
+
+def test_orjson_backend_requires_package(monkeypatch):
+    monkeypatch.setattr(serialization, "JSON_BACKEND", "orjson")
+    monkeypatch.setattr(serialization, "orjson", None)
+    with pytest.raises(RuntimeError, match="orjson"):
+        dumps({})
+
+
+@pytest.mark.parametrize("backend", ["json", "orjson"])
+def test_embedded_rows_are_materialized_on_dump(monkeypatch, backend):
+    monkeypatch.setattr(serialization, "JSON_BACKEND", backend)
+    items = {"id": [10, 11, 12]}
+    orders = {"id": [1, 2], "items": [EmbeddedRows(items, [0, 2]), EmbeddedRows(items, [1])]}
+    data = {"users": [{"id": 7, "orders": EmbeddedRows(orders, [1, 0])}]}
+    assert json.loads(dumps(data)) == {"users": [{"id": 7, "orders": [
+        {"id": 2, "items": [{"id": 11}]},
+        {"id": 1, "items": [{"id": 10}, {"id": 12}]},
+    ]}]}
+
+
+@pytest.mark.parametrize("backend", ["json", "orjson"])
+def test_dumps_big_integers(monkeypatch, backend):
+    monkeypatch.setattr(serialization, "JSON_BACKEND", backend)
+    assert dumps({"n": [2**70, -(2**64)]}) == b'{"n":[1180591620717411303424,-18446744073709551616]}'
+
+
+def test_generate_integer_beyond_int64():
+    response = client.post("/api/generate", json={"seed": 1, "blueprint": {"entities": {"users": {
+        "count": 5, "fields": {"big": {"type": "integer", "params": {"min": 2**70, "max": 2**71}}},
+    }}}})
+    assert response.status_code == 200
+    assert all(2**70 <= user["big"] <= 2**71 for user in response.json()["data"]["users"])
+
+
+def test_envelope_embeds_serialized_data_as_is():
+    data = dumps({"users": [{"id": 1}]})
+    assert json.loads(envelope(data, download_url="/x", cached=False)) == {
+        "status": "success", "data": {"users": [{"id": 1}]}, "download_url": "/x", "cached": False,
+    }
+    assert json.loads(envelope(data)) == {"status": "success", "data": {"users": [{"id": 1}]}}
+
+
+def test_generate_writes_file_from_response_bytes(tmp_path, monkeypatch):
+    monkeypatch.setattr("api.routes.generate.GENERATED_DIR", str(tmp_path))
+    response = client.post("/api/generate", json={"blueprint": {"entities": {"users": {
+        "count": 4, "fields": {"id": {"type": "integer"}, "name": {"type": "string"}},
+    }}}})
+    assert response.status_code == 200
+    body = response.json()
+    written = (tmp_path / body["download_url"].split("/")[-1]).read_bytes()
+    assert written == dumps(body["data"])
+    assert b"\n" not in written
@@ -0,0 +1,108 @@
+from fastapi.testclient import TestClient
+
+from api.main import app
+from core.compiler import BlueprintCache
+from core.engine import DataGenerationEngine
+from core.models import Blueprint
+from core.tracing import NULL_TRACER, Tracer
+
+client = TestClient(app)
+
+
+def make_blueprint(users=40):
+    return {"entities": {
+        "users": {
+            "count": users,
+            "fields": {
+                "id": {"type": "uuid"},
+                "age": {"type": "integer", "params": {"min": 18, "max": 90}},
+                "orders": {"type": "one_to_many", "params": {"entity": "orders", "foreign_field": "user_id"}},
+            },
+        },
+        "orders": {
+            "count": 80,
+            "fields": {
+                "user_id": {"type": "reference", "params": {"entity": "users", "field": "id"}},
+                "total": {"type": "float", "params": {"min": 1, "max": 100}},
+            },
+            "rules": [{
+                "if": {"entity": "users", "local_field": "user_id", "field": "age", "op": "gt", "value": 60},
+                "then": {"action": "set", "field": "total", "min": 500, "max": 600},
+            }],
+        },
+    }}
+
+
+def test_tracer_accumulates_spans():
+    tracer = Tracer()
+    for _ in range(3):
+        with tracer.span("phase"):
+            pass
+    tracer.merge({"phase": [0.5, 2], "other": [0.25, 1]})
+
+    summary = tracer.summary()
+    assert summary["phase"]["calls"] == 5
+    assert summary["phase"]["ms"] >= 500
+    assert summary["other"] == {"ms": 250.0, "calls": 1}
+
+
+def test_null_tracer_records_nothing():
+    with NULL_TRACER.span("phase"):
+        pass
+    NULL_TRACER.add("phase", 1.0)
+    assert NULL_TRACER.span("a") is NULL_TRACER.span("b")
+    assert NULL_TRACER.summary() == {}
+    assert not NULL_TRACER.enabled
+
+
+def test_engine_records_phase_and_field_spans():
+    tracer = Tracer()
+    compiled = BlueprintCache().get(Blueprint.from_dict(make_blueprint()), tracer)
+    DataGenerationEngine(seed=1, tracer=tracer).execute(compiled)
+
+    summary = tracer.summary()
+    for phase in ("validate", "topo_sort", "generate_entity", "apply_rules", "resolve_one_to_many", "rows"):
+        assert phase in summary, phase
+    assert summary["field:users.age"]["calls"] == 1
+    assert "field:orders.total" in summary
+
+
+def test_worker_spans_are_merged():
+    blueprint = Blueprint.from_dict(make_blueprint(users=200))
+    tracer = Tracer()
+    DataGenerationEngine(seed=1, workers=2, shard_size=50, tracer=tracer).execute(blueprint)
+
+    summary = tracer.summary()
+    assert summary["generate_entity"]["calls"] >= 4
+    assert summary["field:users.age"]["calls"] == 4
+
+
+def test_tracing_does_not_change_output():
+    blueprint = Blueprint.from_dict(make_blueprint())
+    plain = DataGenerationEngine(seed=9).execute(blueprint)
+    traced = DataGenerationEngine(seed=9, tracer=Tracer()).execute(blueprint)
+    assert plain == traced
+
+
+def test_generate_returns_timings_block():
+    response = client.post(
+        "/api/generate", json={"blueprint": make_blueprint(), "seed": 3, "timings": True}
+    )
+    assert response.status_code == 200
+    timings = response.json()["timings"]
+    for phase in ("compile", "generate_entity", "serialize", "write_artifact"):
+        assert phase in timings, phase
+    assert {"ms", "calls"} <= set(timings["field:users.id"])
+
+
+def test_generate_timings_in_summary_mode():
+    response = client.post(
+        "/api/generate",
+        json={"blueprint": make_blueprint(), "seed": 4, "timings": True, "response_mode": "summary"},
+    )
+    assert "timings" in response.json()
+
+
+def test_generate_without_timings():
+    response = client.post("/api/generate", json={"blueprint": make_blueprint(), "seed": 5})
+    assert "timings" not in response.json()